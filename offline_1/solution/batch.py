@@ -0,0 +1,115 @@
+import csv
+import json
+import sys
+import pmmlcg
+import result_cache
+import single_server_queue
+
+# stream 1 as a standalone run starts it, so a scenario without a seed
+# reproduces single_server_queue.py
+DEFAULT_SEED = pmmlcg.lcgrandgt(1)
+
+def read_scenarios(filename : str):
+    """
+    Yield the scenarios of a JSON-lines file (one object per line) or, if
+    filename ends in .csv, of a CSV file with a header row. A scenario has
+    mean_interarrival, mean_service and num_delays_required, and optionally
+    an id, a seed for stream 1 and n_reps (replications instead of a single
+    run).
+    """
+    with open(filename, newline = "") as f:
+        if filename.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield {key: value for key, value in row.items() if value not in [None, ""]}
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def run_scenario(scenario : dict) -> dict:
+    """
+    Run one scenario without output files and return its result record:
+    the scenario followed by its statistics (a single run) or the
+    (mean, half_width) of each statistic (replications), or by an error
+    message if it could not be run.
+    """
+    record = dict(scenario)
+    num_streams = len(pmmlcg.zrng)
+
+    try:
+        mean_interarrival = float(scenario["mean_interarrival"])
+        mean_service = float(scenario["mean_service"])
+        num_delays_required = int(scenario["num_delays_required"])
+        n_reps = int(scenario.get("n_reps", 0))
+
+        pmmlcg.lcgrandst(int(scenario.get("seed", DEFAULT_SEED)), 1)
+
+        params = [mean_interarrival, mean_service, num_delays_required] + ([n_reps] if n_reps > 0 else [])
+        mode = "batch/replicate" if n_reps > 0 else "batch/run"
+
+        cache = result_cache.default_cache()
+        key = single_server_queue.cache_key(mode, params) if cache is not None else None
+        results = cache.get(key) if cache is not None else None
+
+        if results is None:
+            if n_reps > 0:
+                replications = single_server_queue.replicate(mean_interarrival, mean_service, num_delays_required, n_reps, workers = 1)
+                results = {name: list(replications[name]) for name in replications if name != "replications"}
+            else:
+                simulation = single_server_queue.SingleServerQueue(mean_interarrival, mean_service, num_delays_required, trace_mode = "off", stats_filename = None)
+                simulation.run()
+                results = simulation.statistics()
+
+            if cache is not None:
+                cache.put(key, results)
+
+        record.update(results)
+    except (Exception, SystemExit) as e:
+        # a model that gives up calls exit (after printing why to stderr),
+        # which must not end the whole batch
+        record["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        # drop the streams spawned for replications, which would otherwise
+        # pile up in a long-lived process
+        del pmmlcg.zrng[num_streams:]
+
+    return record
+
+def run_batch(scenarios, out, workers : int = 1):
+    """
+    Run every scenario and write its result record to out as one JSON line
+    as soon as it is available, in the order of the scenarios. With
+    workers > 1 (or None for every core) the scenarios run on a process
+    pool; otherwise they run one after another in this process.
+    """
+    if workers == 1:
+        records = map(run_scenario, scenarios)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers = workers)
+        records = executor.map(run_scenario, scenarios)
+
+    try:
+        for record in records:
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if workers != 1:
+            executor.shutdown()
+
+if __name__ == "__main__":
+    if len(sys.argv) not in [2, 3, 4]:
+        print("Usage: python batch.py <scenarios (.jsonl or .csv)> [output_filename (- for stdout)] [workers]")
+        exit(1)
+
+    output_filename = sys.argv[2] if len(sys.argv) > 2 else "-"
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    scenarios = read_scenarios(sys.argv[1])
+
+    if output_filename == "-":
+        run_batch(scenarios, sys.stdout, workers)
+    else:
+        with open(output_filename, "w") as out:
+            run_batch(scenarios, out, workers)
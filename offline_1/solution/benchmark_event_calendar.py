@@ -0,0 +1,30 @@
+import sys
+import time
+import random
+from event_calendar import EventCalendar, CalendarQueue
+
+def hold_rate(calendar, num_pending : int, num_holds : int) -> float:
+    """
+    Run the classic "hold" benchmark: keep num_pending events on the
+    calendar and repeatedly pop the next event and schedule a new one an
+    exponential time later. Return the number of hold operations per second.
+    """
+    random.seed(1)
+    for _ in range(num_pending):
+        calendar.schedule(random.expovariate(1.0), 1)
+
+    start = time.perf_counter()
+    for _ in range(num_holds):
+        event_time, event_type, _ = calendar.pop()
+        calendar.schedule(event_time + random.expovariate(1.0), event_type)
+
+    return num_holds / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    num_holds = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    print(f"{'pending events':>15}{'heap holds/sec':>18}{'calendar holds/sec':>22}")
+    for num_pending in [10, 1000, 100000, 1000000]:
+        heap_rate = hold_rate(EventCalendar(), num_pending, num_holds)
+        calendar_rate = hold_rate(CalendarQueue(), num_pending, num_holds)
+        print(f"{num_pending:15d}{heap_rate:18.0f}{calendar_rate:22.0f}")
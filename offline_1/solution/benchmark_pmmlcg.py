@@ -0,0 +1,32 @@
+import sys
+import time
+import pmmlcg
+
+def scalar_rate(n : int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        pmmlcg.lcgrand(1)
+    return n / (time.perf_counter() - start)
+
+def block_rate(n : int, block_size : int) -> float:
+    start = time.perf_counter()
+    for _ in range(n // block_size):
+        pmmlcg.lcgrand_block(1, block_size)
+    return (n // block_size) * block_size / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    # the block path must reproduce the scalar stream exactly
+    seed = pmmlcg.lcgrandgt(1)
+    expected = [pmmlcg.lcgrand(1) for _ in range(1000)]
+    pmmlcg.lcgrandst(seed, 1)
+    assert pmmlcg.lcgrand_block(1, 1000).tolist() == expected
+
+    # warm the power table so the block timings measure steady-state draws
+    pmmlcg.lcgrand_block(1, 65536)
+
+    print(f"{'method':>20}{'variates/sec':>18}")
+    print(f"{'lcgrand':>20}{scalar_rate(n):18.0f}")
+    for block_size in [64, 1024, 16384, 65536]:
+        print(f"{'lcgrand_block ' + str(block_size):>20}{block_rate(n, block_size):18.0f}")
@@ -0,0 +1,53 @@
+import os
+import pickle
+import pmmlcg
+
+def save(path : str, simulation, filenames : list = ()):
+    """
+    Write a checkpoint of simulation to path: the pickled object, the state
+    of every pmmlcg stream and the current size of each output file in
+    filenames (None entries are skipped), so load can cut the files back to
+    where they were.
+
+    The checkpoint is written to a temporary file first and then renamed,
+    so a run killed while checkpointing leaves the previous one intact.
+    """
+    sizes = {}
+    for filename in filenames:
+        if filename is not None and os.path.exists(filename):
+            sizes[filename] = os.path.getsize(filename)
+
+    checkpoint = {
+        "simulation": simulation,
+        "zrng": list(pmmlcg.zrng),
+        "file_sizes": sizes
+    }
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        pickle.dump(checkpoint, f, protocol = pickle.HIGHEST_PROTOCOL)
+
+    os.replace(temporary, path)
+
+def load(path : str, simulation_type : type = None):
+    """
+    Read a checkpoint written by save, restore the pmmlcg streams, truncate
+    the output files to their recorded sizes and return the simulation.
+
+    If simulation_type is given and the checkpoint holds a simulation of
+    another type, TypeError is raised before the streams or files are
+    touched.
+    """
+    with open(path, "rb") as f:
+        checkpoint = pickle.load(f)
+
+    simulation = checkpoint["simulation"]
+    if simulation_type is not None and not isinstance(simulation, simulation_type):
+        raise TypeError(f"{path} holds a {type(simulation).__module__}.{type(simulation).__name__}, not a {simulation_type.__module__}.{simulation_type.__name__}")
+
+    pmmlcg.zrng[:] = checkpoint["zrng"]
+
+    for filename, size in checkpoint["file_sizes"].items():
+        os.truncate(filename, size)
+
+    return simulation
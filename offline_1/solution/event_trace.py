@@ -0,0 +1,117 @@
+import struct
+import sys
+
+# record types
+ARRIVAL = 1
+DEPARTURE = 2
+DELAYED = 3
+
+# binary record: event index, record type, customer id, simulation time
+RECORD = struct.Struct("<QBQd")
+
+BUFFER_SIZE = 1 << 20
+
+def format_record(event_index : int, record_type : int, customer : int, time : float) -> str:
+    """
+    Return the text form of a trace record, as written to event_orders.txt.
+    For DELAYED records, customer is the number of customers delayed so far.
+    """
+    if record_type == ARRIVAL:
+        return f"{event_index}. Next event: Customer {customer} Arrival\n"
+    elif record_type == DEPARTURE:
+        return f"{event_index}. Next event: Customer {customer} Departure\n"
+    else:
+        return f"\n---------No. of customers delayed: {customer}--------\n\n"
+
+class TextTrace:
+    """
+    Writes the event trace as text through one buffered file handle.
+    """
+
+    def __init__(self, filename : str, buffer_size : int = BUFFER_SIZE):
+        self.filename = filename
+        self.buffer_size = buffer_size
+        self.file = open(filename, "w", buffering = buffer_size)
+
+    def record(self, event_index : int, record_type : int, customer : int, time : float):
+        self.file.write(format_record(event_index, record_type, customer, time))
+
+    def flush(self):
+        # the trace may be checkpointed after run() closed it, or before reopen
+        if self.file is not None and not self.file.closed:
+            self.file.flush()
+
+    def reopen(self):
+        """
+        Continue writing at the end of the file, after the trace was
+        restored from a checkpoint (which cuts the file back first).
+        """
+        self.file = open(self.filename, "a", buffering = self.buffer_size)
+
+    def __getstate__(self):
+        # a checkpoint keeps the file name, not the handle; the checkpoint
+        # itself records how much of the file was written
+        return {"filename": self.filename, "buffer_size": self.buffer_size}
+
+    def __setstate__(self, state):
+        # unpickling has no side effects: reopen continues the file
+        self.filename = state["filename"]
+        self.buffer_size = state["buffer_size"]
+        self.file = None
+
+    def close(self):
+        self.file.close()
+
+class BinaryTrace:
+    """
+    Writes the event trace as fixed-size binary records, which is cheaper
+    than formatting text. Use render to turn the file into the text trace.
+    """
+
+    def __init__(self, filename : str, buffer_size : int = BUFFER_SIZE):
+        self.filename = filename
+        self.buffer_size = buffer_size
+        self.file = open(filename, "wb", buffering = buffer_size)
+
+    def record(self, event_index : int, record_type : int, customer : int, time : float):
+        self.file.write(RECORD.pack(event_index, record_type, customer, time))
+
+    def flush(self):
+        # same as TextTrace
+        if self.file is not None and not self.file.closed:
+            self.file.flush()
+
+    def reopen(self):
+        self.file = open(self.filename, "ab", buffering = self.buffer_size)
+
+    def __getstate__(self):
+        return {"filename": self.filename, "buffer_size": self.buffer_size}
+
+    def __setstate__(self, state):
+        self.filename = state["filename"]
+        self.buffer_size = state["buffer_size"]
+        self.file = None
+
+    def close(self):
+        self.file.close()
+
+def render(binary_filename : str, text_filename : str):
+    """
+    Render a trace written by BinaryTrace into the text format of TextTrace.
+    """
+    chunk_size = RECORD.size * 65536
+
+    with open(binary_filename, "rb") as f, open(text_filename, "w", buffering = BUFFER_SIZE) as out:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+
+            out.writelines(format_record(*r) for r in RECORD.iter_unpack(chunk))
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python event_trace.py <binary_trace> <text_trace>")
+        exit(1)
+
+    render(sys.argv[1], sys.argv[2])
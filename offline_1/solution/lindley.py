@@ -0,0 +1,103 @@
+import sys
+import pmmlcg
+import stats
+
+def simulate_batch(mean_interarrival, mean_service, num_delays_required, n_reps, confidence = 0.95, spacing = None, batch_size = None) -> dict:
+    """
+    Simulate n_reps replications of the single-server queue at once with
+    the Lindley recursion instead of events.
+
+    For a FIFO single-server queue the delay of customer i + 1 is
+    D[i + 1] = max(0, D[i] + S[i] - A[i + 1]), with S the service times and
+    A the interarrival times. Writing X[i] for the partial sums of
+    S[k] - A[k + 1] (X[0] = 0), the solution is D[i] = X[i] - min(X[0..i]),
+    so a whole (replications x customers) block is two cumulative NumPy
+    passes.
+
+    The run ends, like SingleServerQueue.run, when customer
+    num_delays_required starts service. Every earlier customer has then been
+    served, so the utilization is exact; the time-average number in queue
+    counts the waits of the first num_delays_required customers and leaves
+    out customers that arrive while the last one waits, which biases it by
+    O(1 / num_delays_required).
+
+    Each replication draws its interarrival and service times (-mean *
+    log(u)) with pmmlcg.lcgrand_block from its own stream split from stream
+    1 with pmmlcg.spawn, so the results agree with SingleServerQueue in
+    distribution, not customer by customer. As in replicate, stream 1 is
+    advanced past the replications, and their streams are removed from
+    pmmlcg.zrng when done.
+
+    Returns the statistics of every replication (as NumPy arrays, under
+    "replications") and, for each statistic, the (mean, half_width) of its
+    t-based confidence interval, like replicate in single_server_queue.
+    """
+    n = num_delays_required
+
+    if spacing is None:
+        spacing = max(100000, 2 * n)
+    if batch_size is None:
+        batch_size = max(1, 4000000 // n)
+
+    assert n_reps > 0, "at least one replication is needed"
+    assert n_reps * spacing < pmmlcg.MODULUS - 1, "replications would overlap: generator period exceeded"
+
+    num_streams = len(pmmlcg.zrng)
+    streams = pmmlcg.spawn(n_reps, spacing)
+    pmmlcg.skip(1, (n_reps + 1) * spacing)
+
+    try:
+        replications = __simulate_replications__(streams, mean_interarrival, mean_service, n, batch_size)
+    finally:
+        del pmmlcg.zrng[num_streams:]
+
+    results = {"replications": replications}
+    for key, values in replications.items():
+        results[key] = stats.confidence_interval(values.tolist(), confidence)
+
+    return results
+
+def __simulate_replications__(streams, mean_interarrival, mean_service, n, batch_size) -> dict:
+    import numpy as np
+
+    n_reps = len(streams)
+    replications = {
+        "average_delay": np.empty(n_reps),
+        "average_number_in_queue": np.empty(n_reps),
+        "server_utilization": np.empty(n_reps),
+        "time_simulation_ended": np.empty(n_reps)
+    }
+
+    for start in range(0, n_reps, batch_size):
+        reps = streams[start:start + batch_size]
+
+        u = np.stack([pmmlcg.lcgrand_block(stream, 2 * n) for stream in reps])
+        interarrival = -mean_interarrival * np.log(u[:, :n])
+        service = -mean_service * np.log(u[:, n:])
+
+        x = np.zeros((len(reps), n))
+        np.cumsum(service[:, :-1] - interarrival[:, 1:], axis = 1, out = x[:, 1:])
+        delays = x - np.minimum.accumulate(np.minimum(x, 0.0), axis = 1)
+
+        # the last customer starts service when it arrives plus its delay
+        time_end = interarrival.sum(axis = 1) + delays[:, -1]
+        total_of_delays = delays.sum(axis = 1)
+
+        end = start + len(reps)
+        replications["average_delay"][start:end] = total_of_delays / n
+        replications["average_number_in_queue"][start:end] = total_of_delays / time_end
+        replications["server_utilization"][start:end] = service[:, :-1].sum(axis = 1) / time_end
+        replications["time_simulation_ended"][start:end] = time_end
+
+    return replications
+
+if __name__ == "__main__":
+    if len(sys.argv) != 5:
+        print("Usage: python lindley.py <mean_interarrival> <mean_service> <num_delays_required> <n_reps>")
+        exit(1)
+
+    results = simulate_batch(float(sys.argv[1]), float(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]))
+
+    for key in ["average_delay", "average_number_in_queue", "server_utilization"]:
+        mean, half_width = results[key]
+        print(f"{key}: {mean:.6f} +/- {half_width:.6f}")
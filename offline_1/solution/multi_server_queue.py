@@ -0,0 +1,262 @@
+import sys
+from event_calendar import EventCalendar
+from single_server_queue import SingleServerQueue
+
+class MultiServerQueue(SingleServerQueue):
+    """
+    M/M/c queue: SingleServerQueue with num_servers identical servers
+    sharing one FIFO queue.
+
+    The busy state of each server is a byte in server_busy and the idle
+    servers are kept on a stack (idle_servers), so starting or ending a
+    service is O(1) however many servers there are. A departure event
+    carries the index of its server.
+
+    With num_servers = 1 the run draws the same variates in the same order
+    and produces exactly the results of SingleServerQueue.
+    """
+
+    def __init__(self, mean_interarrival, mean_service, num_delays_required, num_servers = 1, trace_mode = "text", stats_filename = "results.txt", online_stats = None, profiler = None):
+        assert num_servers > 0
+
+        # needed by __write_header__, which the base constructor calls
+        self.num_servers = num_servers
+
+        super().__init__(mean_interarrival, mean_service, num_delays_required, trace_mode, stats_filename, online_stats, profiler)
+
+        self.server_busy = bytearray(num_servers)
+        # lowest index on top, so server 0 is used first
+        self.idle_servers = list(range(num_servers - 1, -1, -1))
+        self.num_busy = 0
+
+    def __write_header__(self, f):
+        if self.num_servers == 1:
+            super().__write_header__(f)
+            return
+
+        f.write("----Multi-Server Queueing System----\n\n")
+        f.write(f"Mean interarrival time: {self.mean_interarrival:.6f} minutes\n")
+        f.write(f"Mean service time: {self.mean_service:.6f} minutes\n")
+        f.write(f"Number of servers: {self.num_servers}\n")
+        f.write(f"Number of customers: {self.num_delays_required}\n\n")
+
+    def __server_available__(self) -> bool:
+        return len(self.idle_servers) > 0
+
+    def __start_service__(self):
+        server = self.idle_servers.pop()
+        self.server_busy[server] = 1
+        self.num_busy += 1
+
+        self.event_calendar.schedule(self.sim_time + self.__random__(self.mean_service), 2, server)
+
+    def __continue_service__(self):
+        # the server that just finished takes the next customer
+        self.event_calendar.schedule(self.sim_time + self.__random__(self.mean_service), 2, self.next_event_data)
+
+    def __end_service__(self):
+        server = self.next_event_data
+        self.server_busy[server] = 0
+        self.idle_servers.append(server)
+        self.num_busy -= 1
+
+    def update_time_avg_stats(self):
+        time_since_last_event = self.sim_time - self.time_last_event
+        self.time_last_event = self.sim_time
+
+        # area_server_status is the area under the number of busy servers
+        self.area_num_in_queue += self.num_in_queue * time_since_last_event
+        self.area_server_status += self.num_busy * time_since_last_event
+
+        if self.online_stats is not None:
+            self.online_stats.record_time(self.num_in_queue, time_since_last_event)
+
+class StationCalendar:
+    """
+    A station's view of the event calendar its TandemQueue shares with the
+    other stations: the events a station schedules carry
+    (station index, data), so the tandem knows which station they are for.
+    """
+
+    def __init__(self, calendar : EventCalendar, station : int):
+        self.calendar = calendar
+        self.station = station
+
+    def __len__(self) -> int:
+        return len(self.calendar)
+
+    def schedule(self, time : float, event_type : int, data = None) -> list:
+        return self.calendar.schedule(time, event_type, (self.station, data))
+
+    def cancel(self, event : list):
+        self.calendar.cancel(event)
+
+class Station(MultiServerQueue):
+    """
+    One station of a TandemQueue: a MultiServerQueue whose events go to
+    the tandem's shared calendar and whose clock the tandem sets before
+    handing it an event. Only the first station has exponential arrivals
+    of its own (mean_interarrival); the others get their customers from
+    the station before them.
+
+    A station's time averages are only brought up to date when it handles
+    an event, so an event touches the stations it involves and never all
+    of them.
+    """
+
+    def __init__(self, calendar : EventCalendar, index : int, mean_service, num_servers = 1, mean_interarrival = None):
+        # set before SingleServerQueue.__init__ schedules the first arrival
+        self.station_calendar = StationCalendar(calendar, index)
+
+        super().__init__(mean_interarrival, mean_service, 0, num_servers, trace_mode = "off", stats_filename = None)
+
+        self.event_calendar = self.station_calendar
+
+    def __update_next_arrival_time__(self):
+        if self.mean_interarrival is not None:
+            self.station_calendar.schedule(self.sim_time + self.__random__(self.mean_interarrival), 1)
+
+    def handle(self, sim_time, event_type, data = None):
+        """
+        Bring the station up to sim_time and handle an arrival (event_type
+        1) or the departure (event_type 2) from server data.
+        """
+        self.sim_time = sim_time
+        self.next_event_type = event_type
+        self.next_event_data = data
+
+        self.update_time_avg_stats()
+
+        if event_type == 1:
+            self.arrive()
+        else:
+            self.depart()
+
+    def statistics(self) -> dict:
+        return {
+            "num_servers": self.num_servers,
+            "customers_delayed": self.num_customers_delayed,
+            "average_delay": self.total_of_delays / self.num_customers_delayed if self.num_customers_delayed else 0.0,
+            "average_number_in_queue": self.area_num_in_queue / self.sim_time,
+            "server_utilization": self.area_server_status / (self.num_servers * self.sim_time)
+        }
+
+class TandemQueue:
+    """
+    Stations in series: customers arrive at the first station (exponential
+    interarrival times), are served at every station in turn (exponential
+    service times) and leave after the last one. Each station is a Station,
+    so the queueing logic is that of SingleServerQueue and MultiServerQueue,
+    and all stations share one event calendar.
+
+    The run ends when num_delays_required customers have started service at
+    the last station. Variates come from stream 1, as in SingleServerQueue.
+    """
+
+    def __init__(self, mean_interarrival, stations : list, num_delays_required, stats_filename = "results.txt"):
+        """
+        stations is a list of (mean_service, num_servers) pairs, one per
+        station in the order customers visit them.
+        """
+        assert len(stations) > 0
+
+        self.mean_interarrival = mean_interarrival
+        self.num_delays_required = num_delays_required
+        self.stats_filename = stats_filename
+
+        # simulation clock
+        self.sim_time = 0.0
+        self.total_events_occurred = 0
+        self.total_customers_arrived = 0
+        self.total_customers_departed = 0
+
+        # event list (the first station schedules the first arrival)
+        self.event_calendar = EventCalendar()
+        self.stations = [Station(self.event_calendar, k, mean_service, num_servers, mean_interarrival if k == 0 else None) for k, (mean_service, num_servers) in enumerate(stations)]
+
+    def run(self):
+        last = self.stations[-1]
+
+        while last.num_customers_delayed < self.num_delays_required:
+            if len(self.event_calendar) == 0:
+                print(f"Event list empty at time {self.sim_time}", file = sys.stderr)
+                exit(1)
+
+            self.total_events_occurred += 1
+            self.sim_time, event_type, (k, data) = self.event_calendar.pop()
+
+            self.stations[k].handle(self.sim_time, event_type, data)
+
+            if event_type == 1:
+                self.total_customers_arrived += 1
+            elif k + 1 < len(self.stations):
+                # the customer moves on to the next station
+                self.stations[k + 1].handle(self.sim_time, 1)
+            else:
+                self.total_customers_departed += 1
+
+        # bring every station's accumulators up to the end of the run
+        for station in self.stations:
+            station.sim_time = self.sim_time
+            station.update_time_avg_stats()
+
+        self.report()
+
+    def statistics(self) -> dict:
+        """
+        Return the statistics of every station and the time the run ended.
+        """
+        return {
+            "stations": [station.statistics() for station in self.stations],
+            "time_simulation_ended": self.sim_time
+        }
+
+    def report(self):
+        if self.stats_filename is None:
+            return
+
+        with open(self.stats_filename, "w") as f:
+            f.write("----Tandem Queueing System----\n\n")
+            f.write(f"Mean interarrival time: {self.mean_interarrival:.6f} minutes\n")
+            f.write(f"Number of stations: {len(self.stations)}\n")
+            f.write(f"Number of customers: {self.num_delays_required}\n\n")
+
+            for k, station in enumerate(self.stations):
+                statistics = station.statistics()
+                f.write(f"Station {k + 1}: {station.num_servers} server(s), mean service time {station.mean_service:.6f} minutes\n")
+                f.write(f"Average delay in queue: {statistics['average_delay']:.6f} minutes\n")
+                f.write(f"Average number in queue: {statistics['average_number_in_queue']:.6f}\n")
+                f.write(f"Server utilization: {statistics['server_utilization']:.6f}\n\n")
+
+            f.write(f"Time simulation ended: {self.sim_time:.6f} minutes\n")
+
+if __name__ == "__main__":
+    # python multi_server_queue.py <num_servers>
+    #     M/M/c queue with the parameters of in.txt
+    # python multi_server_queue.py tandem <mean_service> <num_servers> [<mean_service> <num_servers> ...]
+    #     stations in series, with the mean interarrival time and number of
+    #     customers of in.txt
+    try:
+        with open("in.txt", "r") as f:
+            inputs = list(map(float, f.readline().split(" ")))
+            mean_interarrival = inputs[0]
+            mean_service = inputs[1]
+            num_delays_required = int(inputs[2])
+    except:
+        print("Error reading input file")
+        exit(1)
+
+    if len(sys.argv) > 2 and sys.argv[1] == "tandem" and len(sys.argv) % 2 == 0:
+        stations = [(float(sys.argv[i]), int(sys.argv[i + 1])) for i in range(2, len(sys.argv), 2)]
+
+        tandem_queue = TandemQueue(mean_interarrival, stations, num_delays_required)
+        tandem_queue.run()
+    elif len(sys.argv) == 2:
+        multi_server_queue = MultiServerQueue(mean_interarrival, mean_service, num_delays_required, int(sys.argv[1]))
+        multi_server_queue.run()
+    else:
+        print("Usage: python multi_server_queue.py <num_servers>\n"
+              "       python multi_server_queue.py tandem <mean_service> <num_servers> [<mean_service> <num_servers> ...]")
+        exit(1)
+
+    print("Simulation ended")
@@ -0,0 +1,371 @@
+import json
+import math
+from array import array
+import stats
+
+class Welford:
+    """
+    Running mean and variance of a stream of observations (Welford's
+    algorithm), in constant memory.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x : float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def confidence_interval(self, confidence : float = 0.95) -> tuple:
+        """
+        Return (mean, half_width) of the t-based confidence interval for the
+        mean, treating the observations as independent.
+        """
+        if self.count < 2:
+            return self.mean, math.inf
+
+        return self.mean, stats.t_quantile(0.5 + confidence / 2.0, self.count - 1) * math.sqrt(self.variance() / self.count)
+
+class BatchMeans:
+    """
+    Nonoverlapping batch means of a (correlated) stream of observations.
+    With batches long enough for their means to be nearly independent, the
+    confidence interval of the batch means is valid for the steady-state mean.
+    """
+
+    def __init__(self, batch_size : int = 1000):
+        assert batch_size > 0
+
+        self.batch_size = batch_size
+        self.batch_sum = 0.0
+        self.batch_count = 0
+        self.means = Welford()
+
+    def add(self, x : float):
+        self.batch_sum += x
+        self.batch_count += 1
+
+        if self.batch_count == self.batch_size:
+            self.means.add(self.batch_sum / self.batch_size)
+            self.batch_sum = 0.0
+            self.batch_count = 0
+
+    def num_batches(self) -> int:
+        return self.means.count
+
+    def confidence_interval(self, confidence : float = 0.95) -> tuple:
+        """
+        Return (mean, half_width) over the completed batches.
+        """
+        return self.means.confidence_interval(confidence)
+
+class P2Quantile:
+    """
+    Estimate of the p-quantile of a stream of observations with the P^2
+    algorithm (R. Jain and I. Chlamtac, 1985), which keeps five markers
+    instead of the observations.
+
+    The markers are adjusted one observation at a time, which assumes the
+    observations arrive in random order. On autocorrelated output such as
+    the successive delays of a queue, tail quantiles can be far off (in an
+    M/M/1 run with rho = 0.8, the estimated delay p99 is about 50% too
+    high), so use LogHistogram for those.
+    """
+
+    def __init__(self, p : float):
+        assert 0.0 < p < 1.0
+
+        self.p = p
+        self.count = 0
+        self.heights = []
+        self.positions = [0, 1, 2, 3, 4]
+        self.desired = [0.0, 2.0 * p, 4.0 * p, 2.0 + 2.0 * p, 4.0]
+        self.increments = [0.0, p / 2.0, p, (1.0 + p) / 2.0, 1.0]
+
+    def add(self, x : float):
+        self.count += 1
+        q = self.heights
+
+        if self.count <= 5:
+            q.append(x)
+            if self.count == 5:
+                q.sort()
+            return
+
+        n = self.positions
+
+        # find the cell x falls in, stretching the extreme markers if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # move the middle markers towards their desired positions
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+
+                # piecewise-parabolic prediction, or linear if that is not monotone
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+
+                q[i] = height
+                n[i] += d
+
+    def value(self) -> float:
+        if self.count == 0:
+            return math.nan
+
+        if self.count < 5:
+            ordered = sorted(self.heights)
+            return ordered[min(int(self.p * self.count), self.count - 1)]
+
+        return self.heights[2]
+
+class LogHistogram:
+    """
+    Quantile estimates with a bounded relative error from a histogram of
+    the observations on logarithmic buckets (as in the DDSketch of
+    C. Masson et al., 2019): a positive x is counted in bucket
+    ceil(log(x) / log(gamma)), gamma = (1 + relative_error) / (1 -
+    relative_error), and zeros are counted on their own.
+
+    Unlike P2Quantile the estimates do not depend on the order of the
+    observations, so they hold for correlated streams too. Memory grows
+    with the number of buckets in use, about
+    log(max / min) / (2 * relative_error) for positive observations between
+    min and max.
+    """
+
+    def __init__(self, relative_error : float = 0.005):
+        assert 0.0 < relative_error < 1.0
+
+        self.relative_error = relative_error
+        self.log_gamma = math.log((1.0 + relative_error) / (1.0 - relative_error))
+        self.count = 0
+        self.zeros = 0
+        self.buckets = {}
+
+    def add(self, x : float):
+        assert x >= 0.0
+
+        self.count += 1
+
+        if x == 0.0:
+            self.zeros += 1
+            return
+
+        i = math.ceil(math.log(x) / self.log_gamma)
+        self.buckets[i] = self.buckets.get(i, 0) + 1
+
+    def quantile(self, p : float) -> float:
+        """
+        Return an estimate of the p-quantile within relative_error of the
+        observation of rank p * (count - 1).
+        """
+        assert 0.0 <= p <= 1.0
+
+        if self.count == 0:
+            return math.nan
+
+        rank = p * (self.count - 1)
+        seen = self.zeros
+        if seen > rank:
+            return 0.0
+
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if seen > rank:
+                # the point of bucket (gamma^(i - 1), gamma^i] with the least relative error
+                return 2.0 * math.exp(i * self.log_gamma) / (1.0 + math.exp(self.log_gamma))
+
+        return math.nan
+
+class TimeAverage:
+    """
+    Time-weighted average and maximum of a piecewise-constant quantity.
+    """
+
+    def __init__(self):
+        self.area = 0.0
+        self.time = 0.0
+        self.max = 0.0
+
+    def add(self, value : float, duration : float):
+        self.area += value * duration
+        self.time += duration
+        if value > self.max:
+            self.max = value
+
+    def mean(self) -> float:
+        return self.area / self.time if self.time > 0 else 0.0
+
+class MSER5:
+    """
+    Keeps the means of consecutive batches of 5 observations and detects the
+    end of the initial transient with the MSER-5 rule (K. P. White, 1997):
+    delete the d batches that minimize the squared standard error of the
+    mean of the remaining ones, searching d over the first half of the data.
+
+    Memory grows as one float per 5 observations.
+    """
+
+    def __init__(self, batch_size : int = 5):
+        self.batch_size = batch_size
+        self.batch_sum = 0.0
+        self.batch_count = 0
+        self.means = array('d')
+
+    def add(self, x : float):
+        self.batch_sum += x
+        self.batch_count += 1
+
+        if self.batch_count == self.batch_size:
+            self.means.append(self.batch_sum / self.batch_size)
+            self.batch_sum = 0.0
+            self.batch_count = 0
+
+    def truncation(self) -> int:
+        """
+        Return the number of batches to delete from the start.
+        """
+        means = self.means
+        n = len(means)
+        if n < 2:
+            return 0
+
+        # suffix sums of the batch means and their squares, with the MSER
+        # statistic evaluated for every d in the first half
+        total = 0.0
+        total_squares = 0.0
+        best, best_d = math.inf, 0
+
+        for d in range(n - 1, -1, -1):
+            total += means[d]
+            total_squares += means[d] * means[d]
+
+            if d <= n // 2:
+                remaining = n - d
+                mser = (total_squares - total * total / remaining) / (remaining * remaining)
+                if mser <= best:
+                    best, best_d = mser, d
+
+        return best_d
+
+    def truncated_interval(self, confidence : float = 0.95, num_batches : int = 20) -> tuple:
+        """
+        Return (mean, half_width, deleted_observations) after deleting the
+        warm-up found by truncation(). The half width comes from grouping
+        the remaining batch means into num_batches larger batches; it is
+        infinite while there are fewer than num_batches batch means left.
+        """
+        d = self.truncation()
+        remaining = self.means[d:]
+
+        if len(remaining) < num_batches:
+            mean = math.fsum(remaining) / len(remaining) if remaining else math.nan
+            return mean, math.inf, d * self.batch_size
+
+        # drop the oldest leftover means so the batches are equally long
+        size = len(remaining) // num_batches
+        start = len(remaining) - size * num_batches
+        batches = [math.fsum(remaining[start + i * size:start + (i + 1) * size]) / size for i in range(num_batches)]
+
+        mean, half_width = stats.confidence_interval(batches, confidence)
+
+        return mean, half_width, d * self.batch_size
+
+class QueueStatistics:
+    """
+    Streaming statistics for SingleServerQueue, updated once per delay and
+    once per event in (nearly) constant memory: mean and variance of the
+    delays, a batch-means confidence interval for the steady-state mean
+    delay, delay quantiles and the time-average and maximum number in queue.
+
+    The delay quantiles come from a LogHistogram (within 0.5% of the true
+    value, however correlated the delays are) by default, or from P^2
+    estimators with quantile_estimator = "p2", which use less memory but
+    are unreliable in the tail for queue delays (see P2Quantile).
+
+    If snapshot_every > 0, a JSON line with summary() is appended to
+    snapshot_filename every snapshot_every delays, so long runs can be
+    followed while they are going.
+    """
+
+    def __init__(self, batch_size : int = 1000, quantiles : tuple = (0.5, 0.95, 0.99), confidence : float = 0.95, snapshot_every : int = 0, snapshot_filename : str = "snapshots.jsonl", quantile_estimator : str = "histogram"):
+        assert quantile_estimator in ["histogram", "p2"]
+
+        self.confidence = confidence
+        self.delays = Welford()
+        self.delay_batches = BatchMeans(batch_size)
+        self.quantiles = quantiles
+        self.delay_histogram = LogHistogram() if quantile_estimator == "histogram" else None
+        self.delay_quantiles = [P2Quantile(p) for p in quantiles] if quantile_estimator == "p2" else []
+        self.num_in_queue = TimeAverage()
+        self.time = 0.0
+
+        self.snapshot_every = snapshot_every
+        self.snapshot_filename = snapshot_filename
+        if self.snapshot_every > 0:
+            open(self.snapshot_filename, "w").close()
+
+    def record_delay(self, delay : float):
+        self.delays.add(delay)
+        self.delay_batches.add(delay)
+        if self.delay_histogram is not None:
+            self.delay_histogram.add(delay)
+        for quantile in self.delay_quantiles:
+            quantile.add(delay)
+
+        if self.snapshot_every > 0 and self.delays.count % self.snapshot_every == 0:
+            with open(self.snapshot_filename, "a") as f:
+                f.write(json.dumps(self.summary()) + "\n")
+
+    def record_time(self, num_in_queue : int, duration : float):
+        self.num_in_queue.add(num_in_queue, duration)
+        self.time += duration
+
+    def summary(self) -> dict:
+        mean, half_width = self.delay_batches.confidence_interval(self.confidence)
+
+        if self.delay_histogram is not None:
+            quantiles = {str(p): self.delay_histogram.quantile(p) for p in self.quantiles}
+        else:
+            quantiles = {str(q.p): q.value() for q in self.delay_quantiles}
+
+        return {
+            "time": self.time,
+            "customers_delayed": self.delays.count,
+            "delay_mean": self.delays.mean,
+            "delay_std": math.sqrt(self.delays.variance()),
+            "delay_batch_mean": mean,
+            "delay_batch_half_width": half_width,
+            "delay_batches": self.delay_batches.num_batches(),
+            "delay_quantiles": quantiles,
+            "num_in_queue_mean": self.num_in_queue.mean(),
+            "num_in_queue_max": self.num_in_queue.max
+        }
@@ -0,0 +1,57 @@
+from array import array
+
+class RingBuffer:
+    """
+    FIFO queue of floats stored in a circular array('d').
+
+    append and popleft are O(1); when the array is full its capacity is
+    doubled, so there is no limit on the number of items.
+    """
+
+    def __init__(self, capacity : int = 100):
+        assert capacity > 0
+
+        self.items = array('d', bytes(8 * capacity))
+        self.head = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __grow__(self):
+        # unroll the buffer so the oldest item is first, then double it
+        capacity = len(self.items)
+        items = self.items[self.head:] + self.items[:self.head]
+        items.frombytes(bytes(8 * capacity))
+
+        self.items = items
+        self.head = 0
+
+    def append(self, value : float):
+        if self.count == len(self.items):
+            self.__grow__()
+
+        tail = self.head + self.count
+        if tail >= len(self.items):
+            tail -= len(self.items)
+
+        self.items[tail] = value
+        self.count += 1
+
+    def popleft(self) -> float:
+        if self.count == 0:
+            raise IndexError("pop from an empty ring buffer")
+
+        value = self.items[self.head]
+        self.head += 1
+        if self.head == len(self.items):
+            self.head = 0
+        self.count -= 1
+
+        return value
+
+    def peekleft(self) -> float:
+        if self.count == 0:
+            raise IndexError("peek at an empty ring buffer")
+
+        return self.items[self.head]
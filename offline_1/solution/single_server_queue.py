@@ -1,20 +1,102 @@
 import math
+import os
+import sys
 from enum import Enum
 import pmmlcg
+from event_calendar import EventCalendar
+from ring_buffer import RingBuffer
+import event_trace
+import stats
+import online_stats
+import profiler
+import checkpointing
+import result_cache
+
+# source files the results depend on (see cache_key)
+SOURCES = ["single_server_queue.py", "pmmlcg.py", "event_calendar.py", "ring_buffer.py", "event_trace.py", "stats.py"]
+
+def write_header(f, mean_interarrival, mean_service, num_delays_required):
+    f.write("----Single-Server Queueing System----\n\n")
+    f.write(f"Mean interarrival time: {mean_interarrival:.6f} minutes\n")
+    f.write(f"Mean service time: {mean_service:.6f} minutes\n")
+    f.write(f"Number of customers: {num_delays_required}\n\n")
 
 class ServerStatus(Enum):
     IDLE = 0
     BUSY = 1
 
+class PrecisionRule:
+    """
+    Stopping rule of SingleServerQueue.run_until_precision: collects the
+    delays in an online_stats.MSER5 and checks the truncated confidence
+    interval once min_customers customers are delayed and then every time
+    the count grows by a factor of check_growth.
+    """
+
+    def __init__(self, relative_precision, confidence, min_customers, check_growth, num_delayed = 0):
+        self.relative_precision = relative_precision
+        self.confidence = confidence
+        self.check_growth = check_growth
+
+        self.warmup = online_stats.MSER5()
+        self.next_check = min_customers
+        self.num_delayed = num_delayed
+
+    def update(self, num_customers_delayed, last_delay) -> bool:
+        """
+        Record the delay of the customer just delayed, if any, and return
+        whether the target precision is reached.
+        """
+        if num_customers_delayed == self.num_delayed:
+            return False
+
+        self.num_delayed = num_customers_delayed
+        self.warmup.add(last_delay)
+
+        if num_customers_delayed < self.next_check:
+            return False
+
+        self.next_check = max(self.next_check + 1, int(self.next_check * self.check_growth))
+        mean, half_width, num_deleted = self.warmup.truncated_interval(self.confidence)
+
+        return half_width <= self.relative_precision * abs(mean)
+
+    def result(self, customers_simulated) -> dict:
+        mean, half_width, num_deleted = self.warmup.truncated_interval(self.confidence)
+
+        return {
+            "average_delay": mean,
+            "half_width": half_width,
+            "warmup_customers_deleted": num_deleted,
+            "customers_simulated": customers_simulated
+        }
+
 class SingleServerQueue:
-    def __init__(self, mean_interarrival, mean_service, num_delays_required):
+    # a class attribute, so a subclass can set it before calling __init__
+    num_servers = 1
+
+    def __init__(self, mean_interarrival, mean_service, num_delays_required, trace_mode = "text", stats_filename = "results.txt", online_stats = None, profiler = None):
+        """
+        trace_mode is "text" to write the event trace to event_orders.txt,
+        "binary" to write compact records to event_orders.bin (see
+        event_trace.render) or "off" to skip tracing entirely. If
+        stats_filename is None no results file is written; the results are
+        still available from statistics(). online_stats is an optional
+        online_stats.QueueStatistics that is fed every delay and every
+        event, and whose summary is added to the report. profiler is an
+        optional profiler.EventProfiler; if given, run() uses an
+        instrumented loop and writes the profile summary when it ends.
+        """
         # output files
         self.event_orders_filename = "event_orders.txt"
-        self.stats_filename = "results.txt"
+        self.event_orders_binary_filename = "event_orders.bin"
+        self.stats_filename = stats_filename
 
-        self.Q_LIMIT = 100
-        self.time_arrival = [0.0] * (self.Q_LIMIT + 1)
+        # arrival times of the customers waiting in queue (grows as needed)
+        self.initial_queue_capacity = 100
+        self.time_arrival = RingBuffer(self.initial_queue_capacity)
         self.next_event_type = 0
+        self.next_event_data = None
 
         # simulation parameters
         self.mean_interarrival = mean_interarrival
@@ -37,69 +119,98 @@ class SingleServerQueue:
         self.total_of_delays = 0.0
         self.area_num_in_queue = 0.0
         self.area_server_status = 0.0
+        self.last_delay = 0.0
+        self.online_stats = online_stats
 
-        # event list
-        self.time_next_event = [0.0] * 3
+        # instrumentation (None runs the plain event loop)
+        self.profiler = profiler
+
+        # stopping rule of a run_until_precision run (None runs until
+        # num_delays_required customers are delayed)
+        self.precision_rule = None
+
+        # checkpoint settings of the run (see run), saved with the checkpoints
+        # so a resumed run keeps checkpointing the same way
+        self.checkpoint_every = 0
+        self.checkpoint_filename = "checkpoint.pkl"
+
+        # event list (no departure is scheduled while the server is idle)
+        self.event_calendar = EventCalendar()
         self.__update_next_arrival_time__() # first arrival time
-        self.time_next_event[2] = 1.0e+30 # first departure time (infinity)
 
         # initialize event output files
-        open(self.event_orders_filename, "w").close()
-        with open(self.stats_filename, "w") as f:
-            f.write("----Single-Server Queueing System----\n\n")
-            f.write(f"Mean interarrival time: {self.mean_interarrival:.6f} minutes\n")
-            f.write(f"Mean service time: {self.mean_service:.6f} minutes\n")
-            f.write(f"Number of customers: {self.num_delays_required}\n\n")
+        if trace_mode == "text":
+            self.trace = event_trace.TextTrace(self.event_orders_filename)
+        elif trace_mode == "binary":
+            self.trace = event_trace.BinaryTrace(self.event_orders_binary_filename)
+        elif trace_mode == "off":
+            self.trace = None
+        else:
+            raise ValueError(f"Unknown trace mode: {trace_mode}")
+
+        if self.stats_filename is not None:
+            with open(self.stats_filename, "w") as f:
+                self.__write_header__(f)
+
+    def __write_header__(self, f):
+        write_header(f, self.mean_interarrival, self.mean_service, self.num_delays_required)
 
     def __random__(self, mean):
         return -mean * math.log(pmmlcg.lcgrand(1))
     
     def __update_next_arrival_time__(self):
-        self.time_next_event[1] = self.sim_time + self.__random__(self.mean_interarrival)
+        self.event_calendar.schedule(self.sim_time + self.__random__(self.mean_interarrival), 1)
     
     def __update_next_departure_time__(self):
-        self.time_next_event[2] = self.sim_time + self.__random__(self.mean_service)
+        self.event_calendar.schedule(self.sim_time + self.__random__(self.mean_service), 2)
+
+    # server hooks: MultiServerQueue overrides these for a pool of servers
+
+    def __server_available__(self) -> bool:
+        return self.server_status == ServerStatus.IDLE
+
+    def __start_service__(self):
+        """
+        Start serving a customer on an idle server.
+        """
+        self.server_status = ServerStatus.BUSY
+        self.__update_next_departure_time__()
+
+    def __continue_service__(self):
+        """
+        Start serving the next customer in queue on the server that just
+        finished.
+        """
+        self.__update_next_departure_time__()
+
+    def __end_service__(self):
+        """
+        Make the server that just finished idle.
+        """
+        self.server_status = ServerStatus.IDLE
 
     def timing(self):
-        min_time_next_event = 1.0e+29
-        self.next_event_type = 0
-        num_events = 2 # arrival, departure
-
-        for i in range(1, num_events + 1):
-            if self.time_next_event[i] < min_time_next_event:
-                min_time_next_event = self.time_next_event[i]
-                self.next_event_type = i
-
-        if self.next_event_type == 0:
-            print(f"Event list empty at time {self.sim_time}")
+        if len(self.event_calendar) == 0:
+            print(f"Event list empty at time {self.sim_time}", file = sys.stderr)
             exit(1)
-        
+
         self.total_events_occurred += 1
 
-        self.sim_time = min_time_next_event
+        self.sim_time, self.next_event_type, self.next_event_data = self.event_calendar.pop()
 
     def arrive(self):
         self.__update_next_arrival_time__()
         self.total_customers_arrived += 1
 
-        with open(self.event_orders_filename, "a") as f:
-            f.write(f"{self.total_events_occurred}. Next event: Customer {self.total_customers_arrived} Arrival\n")
+        if self.trace is not None:
+            self.trace.record(self.total_events_occurred, event_trace.ARRIVAL, self.total_customers_arrived, self.sim_time)
 
-        if self.server_status == ServerStatus.BUSY:
+        if not self.__server_available__():
             """
             Server is busy, so increment number of customers in queue.
             """
             self.num_in_queue += 1
-
-            if self.num_in_queue > self.Q_LIMIT:
-                """
-                The queue has overflowed, so stop the simulation.
-                """
-                print("Overflow of the array time_arrival at")
-                print(f"time {self.sim_time}")
-                exit(2)
-
-            self.time_arrival[self.num_in_queue] = self.sim_time
+            self.time_arrival.append(self.sim_time)
         else:
             """
             Server is idle, so arriving customer has a delay of zero. (No need to add delay to total_of_delays.)
@@ -108,26 +219,27 @@ class SingleServerQueue:
             # self.total_of_delays += delay
 
             self.num_customers_delayed += 1
-            self.server_status = ServerStatus.BUSY
+            self.last_delay = 0.0
+            if self.online_stats is not None:
+                self.online_stats.record_delay(0.0)
 
-            self.__update_next_departure_time__()
+            self.__start_service__()
 
-            with open(self.event_orders_filename, "a") as f:
-                f.write(f"\n---------No. of customers delayed: {self.num_customers_delayed}--------\n\n")
+            if self.trace is not None:
+                self.trace.record(self.total_events_occurred, event_trace.DELAYED, self.num_customers_delayed, self.sim_time)
 
     def depart(self):
         self.total_customers_departed += 1
 
-        with open(self.event_orders_filename, "a") as f:
-            f.write(f"{self.total_events_occurred}. Next event: Customer {self.total_customers_departed} Departure\n")
+        if self.trace is not None:
+            self.trace.record(self.total_events_occurred, event_trace.DEPARTURE, self.total_customers_departed, self.sim_time)
 
         if self.num_in_queue == 0:
             """
-            The queue is empty so make the server idle and eliminate the
-            departure (service completion) event from consideration.
+            The queue is empty so make the server idle. No departure
+            (service completion) event is scheduled until the next arrival.
             """
-            self.server_status = ServerStatus.IDLE
-            self.time_next_event[2] = 1.0e+30
+            self.__end_service__()
         else:
             """
             The queue is nonempty, so decrement the number of customers in
@@ -135,26 +247,57 @@ class SingleServerQueue:
             """
             self.num_in_queue -= 1
 
-            delay = self.sim_time - self.time_arrival[1]
+            delay = self.sim_time - self.time_arrival.popleft()
             self.total_of_delays += delay
 
             self.num_customers_delayed += 1
+            self.last_delay = delay
+            if self.online_stats is not None:
+                self.online_stats.record_delay(delay)
+
+            self.__continue_service__()
+            if self.trace is not None:
+                self.trace.record(self.total_events_occurred, event_trace.DELAYED, self.num_customers_delayed, self.sim_time)
+
+    def statistics(self) -> dict:
+        """
+        Return the summary statistics of the run so far.
+        """
+        return {
+            "average_delay": self.total_of_delays / self.num_customers_delayed,
+            "average_number_in_queue": self.area_num_in_queue / self.sim_time,
+            "server_utilization": self.area_server_status / (self.num_servers * self.sim_time),
+            "time_simulation_ended": self.sim_time
+        }
+
+    def report(self):
+        if self.stats_filename is None:
+            return
 
-            self.__update_next_departure_time__()
-            with open(self.event_orders_filename, "a") as f:
-                f.write(f"\n---------No. of customers delayed: {self.num_customers_delayed}--------\n\n")
-                
-
-            for i in range(1, self.num_in_queue + 1):
-                self.time_arrival[i] = self.time_arrival[i + 1]
-
-    def report(self):        
         with open(self.stats_filename, "a") as f:
             f.write(f"Average delay in queue: {self.total_of_delays / self.num_customers_delayed:.6f} minutes\n")
             f.write(f"Average number in queue: {self.area_num_in_queue / self.sim_time:.6f}\n")
-            f.write(f"Server utilization: {self.area_server_status / self.sim_time:.6f}\n")
+            f.write(f"Server utilization: {self.area_server_status / (self.num_servers * self.sim_time):.6f}\n")
             f.write(f"Time simulation ended: {self.sim_time:.6f} minutes\n")
 
+            if self.online_stats is not None:
+                summary = self.online_stats.summary()
+                f.write(f"\nStandard deviation of delay: {summary['delay_std']:.6f} minutes\n")
+                f.write(f"Batch-means average delay: {summary['delay_batch_mean']:.6f} +/- {summary['delay_batch_half_width']:.6f} minutes ({summary['delay_batches']} batches)\n")
+                for p, value in summary["delay_quantiles"].items():
+                    f.write(f"Delay quantile {p}: {value:.6f} minutes\n")
+                f.write(f"Maximum number in queue: {summary['num_in_queue_max']}\n")
+
+            if self.precision_rule is not None:
+                rule = self.precision_rule
+                result = rule.result(self.num_customers_delayed)
+                mean, half_width = result["average_delay"], result["half_width"]
+
+                f.write(f"\nCustomers simulated: {self.num_customers_delayed}\n")
+                f.write(f"Warm-up customers deleted (MSER-5): {result['warmup_customers_deleted']}\n")
+                f.write(f"Steady-state average delay: {mean:.6f} +/- {half_width:.6f} minutes ({rule.confidence:.2f} confidence)\n")
+                f.write(f"Relative half width: {half_width / abs(mean) if mean else math.inf:.6f} (target {rule.relative_precision:.6f})\n")
+
     def update_time_avg_stats(self):
         time_since_last_event = self.sim_time - self.time_last_event
         self.time_last_event = self.sim_time
@@ -162,8 +305,54 @@ class SingleServerQueue:
         self.area_num_in_queue += self.num_in_queue * time_since_last_event
         self.area_server_status += self.server_status.value * time_since_last_event
 
-    def run(self):
-        while self.num_customers_delayed < self.num_delays_required:
+        if self.online_stats is not None:
+            self.online_stats.record_time(self.num_in_queue, time_since_last_event)
+
+    def checkpoint(self, path):
+        """
+        Save the full state of the run (clock, queue, event calendar,
+        accumulators, pmmlcg streams and how much of each output file was
+        written) to path.
+        """
+        filenames = [self.stats_filename]
+        if self.trace is not None:
+            self.trace.flush()
+            filenames.append(self.trace.filename)
+        if self.online_stats is not None and self.online_stats.snapshot_every > 0:
+            filenames.append(self.online_stats.snapshot_filename)
+
+        checkpointing.save(path, self, filenames)
+
+    @classmethod
+    def resume(cls, path):
+        """
+        Load a run saved by checkpoint, restoring the pmmlcg streams and
+        cutting the output files back to the checkpoint. Calling run() on
+        the result finishes the run exactly as if it had never stopped.
+
+        Several continuations can be forked from one checkpoint by resuming
+        it repeatedly (reseeding stream 1 with pmmlcg.lcgrandst after each
+        resume to make them differ).
+
+        Raises TypeError, leaving the streams and files alone, if path holds
+        something other than a cls.
+        """
+        simulation = checkpointing.load(path, cls)
+
+        if simulation.trace is not None:
+            simulation.trace.reopen()
+
+        return simulation
+
+    def __advance__(self):
+        """
+        Process the next event: advance the clock to it, update the
+        time-average statistics and call its handler, each step timed by
+        self.profiler if there is one.
+        """
+        p = self.profiler
+
+        if p is None:
             self.timing()
             self.update_time_avg_stats()
 
@@ -172,8 +361,180 @@ class SingleServerQueue:
 
             elif self.next_event_type == 2:
                 self.depart()
+        else:
+            p.call("timing", self.timing)
+            p.call("update_time_avg_stats", self.update_time_avg_stats)
 
-        self.report()
+            if self.next_event_type == 1:
+                p.dispatch("arrive", self.arrive)
+
+            elif self.next_event_type == 2:
+                p.dispatch("depart", self.depart)
+
+    def run(self, checkpoint_every = None, checkpoint_filename = None):
+        """
+        Run until num_delays_required customers are delayed (or, in a run
+        started by run_until_precision, until its precision target is met)
+        and write the report. If checkpoint_every > 0,
+        checkpoint(checkpoint_filename) is called every checkpoint_every
+        events. Arguments left as None keep the settings the run had (no
+        checkpoints and checkpoint.pkl for a new run), so a run restored
+        with resume goes on checkpointing like the one that was saved.
+
+        With a profiler, every step is timed along with the event calendar,
+        the trace writes and the online statistics updates they make, and
+        the profile summary is written at the end. Profiled runs cannot be
+        checkpointed, as the timing wrappers cannot be saved.
+        """
+        if checkpoint_every is not None:
+            self.checkpoint_every = checkpoint_every
+        if checkpoint_filename is not None:
+            self.checkpoint_filename = checkpoint_filename
+
+        checkpoint_every = self.checkpoint_every
+        checkpoint_filename = self.checkpoint_filename
+
+        p = self.profiler
+        assert p is None or checkpoint_every == 0, "profiled runs cannot be checkpointed"
+
+        if p is not None:
+            p.start()
+
+        try:
+            if p is not None:
+                p.wrap(self.event_calendar, "schedule", "event_calendar.schedule")
+                if self.trace is not None:
+                    p.wrap(self.trace, "record", "trace.record")
+                if self.online_stats is not None:
+                    p.wrap(self.online_stats, "record_delay", "online_stats.record_delay")
+                    p.wrap(self.online_stats, "record_time", "online_stats.record_time")
+
+            while self.num_customers_delayed < self.num_delays_required:
+                self.__advance__()
+
+                if self.precision_rule is not None and self.precision_rule.update(self.num_customers_delayed, self.last_delay):
+                    break
+
+                if checkpoint_every > 0 and self.total_events_occurred % checkpoint_every == 0:
+                    self.checkpoint(checkpoint_filename)
+
+            if p is None:
+                self.report()
+
+                if self.trace is not None:
+                    self.trace.close()
+            else:
+                p.call("report", self.report)
+
+                if self.trace is not None:
+                    p.call("trace.close", self.trace.close)
+        finally:
+            # a run that raises or exits must not leave pmmlcg wrapped
+            if p is not None:
+                p.stop()
+
+        if p is not None:
+            p.write()
+
+    def run_until_precision(self, relative_precision = 0.05, confidence = 0.95, min_customers = 1000, check_growth = 1.25, checkpoint_every = None, checkpoint_filename = None) -> dict:
+        """
+        Run until the confidence interval of the steady-state average delay
+        is tight enough, treating num_delays_required as an upper limit.
+
+        The initial transient is deleted with MSER-5 and the half width comes
+        from batch means of what remains (see online_stats.MSER5). The
+        stopping rule is checked once min_customers customers are delayed
+        and then every time the count grows by a factor of check_growth, so
+        the checks cost O(n) in total. The run stops as soon as
+        half_width <= relative_precision * |mean|.
+
+        The events are processed by run, so profiling and checkpointing
+        work as they do there (a resumed run keeps the stopping rule).
+
+        Returns the truncated average delay, its half width, the number of
+        warm-up customers deleted and the number of customers simulated,
+        which are also added to the report.
+        """
+        self.precision_rule = PrecisionRule(relative_precision, confidence, min_customers, check_growth, self.num_customers_delayed)
+        self.run(checkpoint_every, checkpoint_filename)
+
+        return self.precision_rule.result(self.num_customers_delayed)
+
+def __replication__(args : tuple) -> dict:
+    """
+    Run one replication without any output files, with stream 1 seeded to
+    the given seed. Runs in a worker process of replicate.
+    """
+    mean_interarrival, mean_service, num_delays_required, seed = args
+
+    pmmlcg.lcgrandst(seed, 1)
+    single_server_queue = SingleServerQueue(mean_interarrival, mean_service, num_delays_required, trace_mode = "off", stats_filename = None)
+    single_server_queue.run()
+
+    return single_server_queue.statistics()
+
+def replicate(mean_interarrival, mean_service, num_delays_required, n_reps, workers = None, confidence = 0.95, spacing = None) -> dict:
+    """
+    Run n_reps independent replications on a process pool and return, for
+    each statistic of SingleServerQueue.statistics(), the (mean, half_width)
+    of its t-based confidence interval across replications. The values of
+    the individual replications are returned under "replications".
+
+    Each replication draws from its own stream, split from stream 1 with
+    pmmlcg.split, spacing variates apart (by default enough for the roughly
+    two variates each customer needs). Stream 1 is advanced past them, so
+    successive calls run independent replications. workers = 1 runs the
+    replications in this process.
+    """
+    if spacing is None:
+        spacing = max(100000, 4 * num_delays_required)
+
+    assert n_reps > 0, "at least one replication is needed"
+    assert n_reps * spacing < pmmlcg.MODULUS - 1, "replications would overlap: generator period exceeded"
+
+    seeds = pmmlcg.split(n_reps, spacing)
+    tasks = [(mean_interarrival, mean_service, num_delays_required, seed) for seed in seeds]
+
+    if workers == 1:
+        # the replications reseed stream 1 in this process, so put it back
+        # where split left it
+        parent = pmmlcg.lcgrandgt(1)
+        replications = list(map(__replication__, tasks))
+        pmmlcg.lcgrandst(parent, 1)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            replications = list(executor.map(__replication__, tasks, chunksize = max(1, n_reps // 64)))
+
+    results = {"replications": replications}
+    for key in replications[0]:
+        results[key] = stats.confidence_interval([r[key] for r in replications], confidence)
+
+    return results
+
+def cache_key(mode : str, params : list) -> str:
+    """
+    Return the result cache key of a run of the given mode ("run" or
+    "replicate") and parameters, seeded from the current state of stream 1.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    version = result_cache.code_version(*[os.path.join(directory, filename) for filename in SOURCES])
+
+    return result_cache.make_key("single_server_queue/" + mode, params, [pmmlcg.lcgrandgt(1)], version)
+
+def report_replications(filename, mean_interarrival, mean_service, num_delays_required, results, confidence = 0.95):
+    with open(filename, "w") as f:
+        write_header(f, mean_interarrival, mean_service, num_delays_required)
+        f.write(f"Number of replications: {len(results['replications'])}\n")
+        f.write(f"Confidence level: {confidence:.2f}\n\n")
+
+        mean, half_width = results["average_delay"]
+        f.write(f"Average delay in queue: {mean:.6f} +/- {half_width:.6f} minutes\n")
+        mean, half_width = results["average_number_in_queue"]
+        f.write(f"Average number in queue: {mean:.6f} +/- {half_width:.6f}\n")
+        mean, half_width = results["server_utilization"]
+        f.write(f"Server utilization: {mean:.6f} +/- {half_width:.6f}\n")
 
 
 if __name__ == "__main__":
@@ -192,7 +553,60 @@ if __name__ == "__main__":
         print("Error reading input file")
         exit(1)
 
-    single_server_queue = SingleServerQueue(mean_interarrival, mean_service, num_delays_required)
-    single_server_queue.run()
+    # use the class of the importable module rather than of __main__, so
+    # the checkpoints written here can be resumed from any script
+    from single_server_queue import SingleServerQueue
+
+    if len(sys.argv) > 1 and sys.argv[1] == "resume":
+        # python single_server_queue.py resume [checkpoint_filename]
+        # (finishes a run saved with "checkpoint", with the parameters and
+        # checkpoint interval it was started with)
+        single_server_queue = SingleServerQueue.resume(sys.argv[2] if len(sys.argv) > 2 else "checkpoint.pkl")
+        single_server_queue.run()
+    elif len(sys.argv) > 1 and sys.argv[1] == "profile":
+        # python single_server_queue.py profile (writes profile.json)
+        single_server_queue = SingleServerQueue(mean_interarrival, mean_service, num_delays_required, profiler = profiler.EventProfiler())
+        single_server_queue.run()
+    elif len(sys.argv) > 2 and sys.argv[1] == "checkpoint":
+        # python single_server_queue.py checkpoint <every> (writes checkpoint.pkl)
+        single_server_queue = SingleServerQueue(mean_interarrival, mean_service, num_delays_required)
+        single_server_queue.run(int(sys.argv[2]))
+    elif len(sys.argv) > 1 and sys.argv[1] == "precision":
+        # python single_server_queue.py precision [relative_precision]
+        # (the number of customers in in.txt becomes an upper limit)
+        relative_precision = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+        single_server_queue = SingleServerQueue(mean_interarrival, mean_service, num_delays_required)
+        single_server_queue.run_until_precision(relative_precision)
+    elif len(sys.argv) > 1:
+        # python single_server_queue.py <n_reps> [workers]
+        # (the results do not depend on the number of workers, so neither does the cache key)
+        n_reps = int(sys.argv[1])
+        workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+        cache = result_cache.default_cache()
+        key = cache_key("replicate", [mean_interarrival, mean_service, num_delays_required, n_reps]) if cache is not None else None
+
+        if cache is not None and cache.get_files(key, ["results.txt"]):
+            print("Results from cache", file = sys.stderr)
+        else:
+            results = replicate(mean_interarrival, mean_service, num_delays_required, n_reps, workers)
+            report_replications("results.txt", mean_interarrival, mean_service, num_delays_required, results)
+
+            if cache is not None:
+                cache.put_files(key, ["results.txt"])
+    else:
+        cache = result_cache.default_cache()
+        key = cache_key("run", [mean_interarrival, mean_service, num_delays_required]) if cache is not None else None
+        output_filenames = ["results.txt", "event_orders.txt"]
+
+        if cache is not None and cache.get_files(key, output_filenames):
+            print("Results from cache", file = sys.stderr)
+        else:
+            single_server_queue = SingleServerQueue(mean_interarrival, mean_service, num_delays_required)
+            single_server_queue.run()
+
+            if cache is not None:
+                cache.put_files(key, output_filenames)
 
     print("Simulation ended")
\ No newline at end of file
@@ -0,0 +1,123 @@
+import math
+
+def __betacf__(a : float, b : float, x : float) -> float:
+    """
+    Continued fraction for the incomplete beta function (modified Lentz's
+    method, as in Numerical Recipes).
+    """
+    tiny = 1.0e-300
+    qab = a + b
+    qap = a + 1.0
+    qam = a - 1.0
+
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    if abs(d) < tiny:
+        d = tiny
+    d = 1.0 / d
+    h = d
+
+    for m in range(1, 301):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        if abs(d) < tiny:
+            d = tiny
+        c = 1.0 + aa / c
+        if abs(c) < tiny:
+            c = tiny
+        d = 1.0 / d
+        h *= d * c
+
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        if abs(d) < tiny:
+            d = tiny
+        c = 1.0 + aa / c
+        if abs(c) < tiny:
+            c = tiny
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+
+        if abs(delta - 1.0) < 1.0e-15:
+            break
+
+    return h
+
+def betainc(a : float, b : float, x : float) -> float:
+    """
+    Return the regularized incomplete beta function I_x(a, b).
+    """
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x))
+
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * __betacf__(a, b, x) / a
+    else:
+        return 1.0 - front * __betacf__(b, a, 1.0 - x) / b
+
+def t_cdf(t : float, df : float) -> float:
+    """
+    Return P[T <= t] for Student's t distribution with df degrees of freedom.
+    """
+    tail = 0.5 * betainc(df / 2.0, 0.5, df / (df + t * t))
+
+    return 1.0 - tail if t > 0 else tail
+
+def t_quantile(p : float, df : float) -> float:
+    """
+    Return the p-quantile of Student's t distribution with df degrees of
+    freedom, found by bisection on t_cdf.
+    """
+    assert 0.0 < p < 1.0 and df > 0
+
+    if p < 0.5:
+        return -t_quantile(1.0 - p, df)
+
+    lo, hi = 0.0, 1.0
+    while t_cdf(hi, df) < p:
+        lo, hi = hi, 2.0 * hi
+
+    for _ in range(200):
+        mid = 0.5 * (lo + hi)
+        if t_cdf(mid, df) < p:
+            lo = mid
+        else:
+            hi = mid
+
+        if hi - lo < 1.0e-12 * hi:
+            break
+
+    return 0.5 * (lo + hi)
+
+def mean_and_variance(values : list) -> tuple:
+    """
+    Return the sample mean and (unbiased) sample variance of values.
+    """
+    n = len(values)
+    assert n > 0
+
+    mean = math.fsum(values) / n
+    if n == 1:
+        return mean, 0.0
+
+    return mean, math.fsum((v - mean) ** 2 for v in values) / (n - 1)
+
+def confidence_interval(values : list, confidence : float = 0.95) -> tuple:
+    """
+    Return (mean, half_width) of the t-based confidence interval for the mean
+    of the independent observations in values. The half width is infinite
+    when there are fewer than two observations.
+    """
+    n = len(values)
+    mean, variance = mean_and_variance(values)
+
+    if n < 2:
+        return mean, math.inf
+
+    return mean, t_quantile(0.5 + confidence / 2.0, n - 1) * math.sqrt(variance / n)
@@ -0,0 +1,145 @@
+import csv
+import json
+import sys
+import pmmlcg
+import result_cache
+from main import parse_input, cache_key
+from single_product_inventory_system import SingleProductInventorySystem
+
+# stream 1 as a standalone run starts it, so a scenario without a seed
+# reproduces main.py
+DEFAULT_SEED = pmmlcg.lcgrandgt(1)
+
+# the arguments of SingleProductInventorySystem, in the order parse_input returns them
+ARGUMENTS = ["initial_inventory_level", "num_months", "num_policies", "num_values_demand", "mean_interdemand", "setup_cost", "incremental_cost", "holding_cost", "shortage_cost", "minlag", "maxlag", "prob_distrib_demand", "small_policies", "big_policies"]
+
+COSTS = ["average_total_cost", "average_ordering_cost", "average_holding_cost", "average_shortage_cost"]
+
+def read_scenarios(filename : str):
+    """
+    Yield the scenarios of a JSON-lines file (one object per line) or, if
+    filename ends in .csv, of a CSV file with a header row whose cells are
+    read as JSON where possible (so numbers and lists like [20, 40] work)
+    and as strings otherwise.
+
+    A scenario has an input file ("input", in the format of main.py)
+    and/or any of the ARGUMENTS, which override the values of the input
+    file, and optionally an id, a seed for stream 1 and num_replications
+    (independent replications of every policy instead of one sequential
+    run).
+    """
+    with open(filename, newline = "") as f:
+        if filename.endswith(".csv"):
+            for row in csv.DictReader(f):
+                scenario = {}
+                for key, value in row.items():
+                    if value in [None, ""]:
+                        continue
+                    try:
+                        scenario[key] = json.loads(value)
+                    except ValueError:
+                        scenario[key] = value
+
+                yield scenario
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def __arguments__(scenario : dict) -> list:
+    args = parse_input(scenario["input"]) if "input" in scenario else [None] * len(ARGUMENTS)
+
+    for i, name in enumerate(ARGUMENTS):
+        if name in scenario:
+            args[i] = scenario[name]
+
+    # the counts follow the lists when those are overridden
+    args[ARGUMENTS.index("num_policies")] = len(args[ARGUMENTS.index("small_policies")])
+    args[ARGUMENTS.index("num_values_demand")] = len(args[ARGUMENTS.index("prob_distrib_demand")])
+
+    return args
+
+def run_scenario(scenario : dict) -> dict:
+    """
+    Run one scenario without output files and return its result record:
+    the scenario followed by the costs of every policy, or by an error
+    message if it could not be run.
+    """
+    record = dict(scenario)
+    num_streams = len(pmmlcg.zrng)
+
+    try:
+        args = __arguments__(scenario)
+        num_replications = int(scenario.get("num_replications", 1))
+
+        pmmlcg.lcgrandst(int(scenario.get("seed", DEFAULT_SEED)), 1)
+
+        cache = result_cache.default_cache()
+        key = cache_key("batch/" + ("replicated" if num_replications > 1 else "sequential"), args + [num_replications]) if cache is not None else None
+        policies = cache.get(key) if cache is not None else None
+
+        if policies is None:
+            system = SingleProductInventorySystem(*args)
+
+            if num_replications > 1:
+                costs = system.replicate_policies(num_replications)
+            else:
+                costs = [system.evaluate_policy(smalls, bigs) for smalls, bigs in zip(system.small_policies, system.big_policies)]
+
+            policies = []
+            for smalls, bigs, policy_costs in zip(system.small_policies, system.big_policies, costs):
+                policies.append({"smalls": smalls, "bigs": bigs, **dict(zip(COSTS, policy_costs))})
+
+            if cache is not None:
+                cache.put(key, policies)
+
+        record["policies"] = policies
+    except (Exception, SystemExit) as e:
+        # a model that gives up calls exit (after printing why to stderr),
+        # which must not end the whole batch
+        record["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        # drop the streams spawned for replications, which would otherwise
+        # pile up in a long-lived process
+        del pmmlcg.zrng[num_streams:]
+
+    return record
+
+def run_batch(scenarios, out, workers : int = 1):
+    """
+    Run every scenario and write its result record to out as one JSON line
+    as soon as it is available, in the order of the scenarios. With
+    workers > 1 (or None for every core) the scenarios run on a process
+    pool; otherwise they run one after another in this process.
+    """
+    if workers == 1:
+        records = map(run_scenario, scenarios)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers = workers)
+        records = executor.map(run_scenario, scenarios)
+
+    try:
+        for record in records:
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if workers != 1:
+            executor.shutdown()
+
+if __name__ == "__main__":
+    if len(sys.argv) not in [2, 3, 4]:
+        print("Usage: python batch.py <scenarios (.jsonl or .csv)> [output_filename (- for stdout)] [workers]")
+        exit(1)
+
+    output_filename = sys.argv[2] if len(sys.argv) > 2 else "-"
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    scenarios = read_scenarios(sys.argv[1])
+
+    if output_filename == "-":
+        run_batch(scenarios, sys.stdout, workers)
+    else:
+        with open(output_filename, "w") as out:
+            run_batch(scenarios, out, workers)
@@ -0,0 +1,245 @@
+import heapq
+import bisect
+
+# Layout of a scheduled event. Events are plain lists so that they compare
+# by (time, event type, sequence number), which is the order they are
+# processed in: simultaneous events are handled in increasing order of event
+# type (as the original scan over time_next_event did) and then in the order
+# they were scheduled.
+TIME = 0
+EVENT_TYPE = 1
+SEQUENCE = 2
+DATA = 3
+PENDING = 4
+
+class EventCalendar:
+    """
+    Future event list backed by a binary heap.
+
+    schedule and pop are O(log n) in the number of pending events. cancel is
+    O(1): the event is only marked and is dropped when it reaches the top of
+    the heap (lazy deletion).
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.num_scheduled = 0
+        self.num_cancelled = 0
+
+    def __len__(self) -> int:
+        return len(self.heap) - self.num_cancelled
+
+    def schedule(self, time : float, event_type : int, data = None) -> list:
+        """
+        Schedule an event and return a handle that can be passed to cancel.
+
+        Parameters:
+        -----------
+            time: the time the event occurs
+            event_type: the type of the event
+            data: any value to hand back with the event when it occurs
+        """
+        event = [time, event_type, self.num_scheduled, data, True]
+        self.num_scheduled += 1
+        heapq.heappush(self.heap, event)
+
+        return event
+
+    def cancel(self, event : list):
+        """
+        Cancel a pending event. Cancelling an event that already occurred or
+        was already cancelled does nothing.
+        """
+        if not event[PENDING]:
+            return
+
+        event[PENDING] = False
+        self.num_cancelled += 1
+
+        # rebuild the heap once it is mostly cancelled events
+        if self.num_cancelled > 64 and self.num_cancelled > len(self.heap) // 2:
+            self.heap = [e for e in self.heap if e[PENDING]]
+            heapq.heapify(self.heap)
+            self.num_cancelled = 0
+
+    def __discard_cancelled__(self):
+        heap = self.heap
+        while heap and not heap[0][PENDING]:
+            heapq.heappop(heap)
+            self.num_cancelled -= 1
+
+    def peek_time(self) -> float:
+        """
+        Return the time of the next event without removing it.
+        """
+        self.__discard_cancelled__()
+
+        if not self.heap:
+            raise IndexError("peek at an empty event calendar")
+
+        return self.heap[0][TIME]
+
+    def pop(self) -> tuple:
+        """
+        Remove the next event and return its (time, event_type, data).
+        """
+        self.__discard_cancelled__()
+
+        if not self.heap:
+            raise IndexError("pop from an empty event calendar")
+
+        event = heapq.heappop(self.heap)
+        event[PENDING] = False
+
+        return event[TIME], event[EVENT_TYPE], event[DATA]
+
+
+class CalendarQueue:
+    """
+    Future event list backed by a calendar queue (R. Brown, 1988).
+
+    Events are hashed by time into buckets of a fixed width that together
+    make up one "year"; each bucket is kept sorted. When the bucket width
+    matches the event density, schedule and pop take O(1) expected time. The
+    number of buckets doubles or halves as the number of events grows or
+    shrinks, and the width is re-estimated from the spacing of the earliest
+    events. Cancellation uses lazy deletion as in EventCalendar.
+
+    Events must not be scheduled earlier than the last event popped, which
+    always holds for a discrete-event simulation.
+    """
+
+    MIN_BUCKETS = 2
+
+    def __init__(self, width : float = 1.0):
+        self.num_scheduled = 0
+        self.num_cancelled = 0
+        self.size = 0
+        self.__resize__(self.MIN_BUCKETS, width, 0)
+
+    def __len__(self) -> int:
+        return self.size - self.num_cancelled
+
+    def __resize__(self, num_buckets : int, width : float, current_bucket : int, events : list = ()):
+        self.num_buckets = num_buckets
+        self.width = width
+        self.buckets = [[] for _ in range(num_buckets)]
+
+        # number of the bucket (counted from time 0, not modulo num_buckets)
+        # the next event is searched for from
+        self.current_bucket = current_bucket
+
+        for event in events:
+            bisect.insort(self.buckets[int(event[TIME] // width) % num_buckets], event)
+
+    def __new_width__(self) -> float:
+        """
+        Estimate a bucket width from the average spacing of the earliest
+        pending events, as suggested by Brown.
+        """
+        times = heapq.nsmallest(25, (e[TIME] for bucket in self.buckets for e in bucket if e[PENDING]))
+        if len(times) < 2 or times[-1] == times[0]:
+            return self.width
+
+        return 3.0 * (times[-1] - times[0]) / (len(times) - 1)
+
+    def __rebuild__(self, num_buckets : int):
+        width = self.__new_width__()
+        events = [e for bucket in self.buckets for e in bucket if e[PENDING]]
+        current_bucket = int(min(events)[TIME] // width) if events else 0
+
+        self.size = len(events)
+        self.num_cancelled = 0
+        self.__resize__(num_buckets, width, current_bucket, events)
+
+    def schedule(self, time : float, event_type : int, data = None) -> list:
+        """
+        Schedule an event and return a handle that can be passed to cancel.
+
+        Parameters:
+        -----------
+            time: the time the event occurs
+            event_type: the type of the event
+            data: any value to hand back with the event when it occurs
+        """
+        event = [time, event_type, self.num_scheduled, data, True]
+        self.num_scheduled += 1
+
+        bucket = int(time // self.width)
+        bisect.insort(self.buckets[bucket % self.num_buckets], event)
+        self.size += 1
+
+        if bucket < self.current_bucket:
+            self.current_bucket = bucket
+
+        if len(self) > 2 * self.num_buckets:
+            self.__rebuild__(2 * self.num_buckets)
+
+        return event
+
+    def cancel(self, event : list):
+        """
+        Cancel a pending event. Cancelling an event that already occurred or
+        was already cancelled does nothing.
+        """
+        if not event[PENDING]:
+            return
+
+        event[PENDING] = False
+        self.num_cancelled += 1
+
+    def __find_next__(self) -> list:
+        """
+        Return the bucket holding the next pending event (at its head),
+        dropping cancelled events on the way. The calendar must not be empty.
+        """
+        buckets = self.buckets
+        num_buckets = self.num_buckets
+        width = self.width
+
+        # scan one year of buckets for an event that falls in the current one
+        current_bucket = self.current_bucket
+        for _ in range(num_buckets):
+            bucket = buckets[current_bucket % num_buckets]
+
+            while bucket and not bucket[0][PENDING]:
+                del bucket[0]
+                self.size -= 1
+                self.num_cancelled -= 1
+
+            if bucket and bucket[0][TIME] // width <= current_bucket:
+                self.current_bucket = current_bucket
+                return bucket
+
+            current_bucket += 1
+
+        # nothing within a year, so jump straight to the earliest event
+        bucket = min((b for b in buckets if b), key = lambda b: b[0])
+        self.current_bucket = int(bucket[0][TIME] // width)
+
+        return bucket
+
+    def peek_time(self) -> float:
+        """
+        Return the time of the next event without removing it.
+        """
+        if len(self) == 0:
+            raise IndexError("peek at an empty event calendar")
+
+        return self.__find_next__()[0][TIME]
+
+    def pop(self) -> tuple:
+        """
+        Remove the next event and return its (time, event_type, data).
+        """
+        if len(self) == 0:
+            raise IndexError("pop from an empty event calendar")
+
+        event = self.__find_next__().pop(0)
+        event[PENDING] = False
+        self.size -= 1
+
+        if self.num_buckets > self.MIN_BUCKETS and len(self) < self.num_buckets // 2:
+            self.__rebuild__(self.num_buckets // 2)
+
+        return event[TIME], event[EVENT_TYPE], event[DATA]
@@ -0,0 +1,149 @@
+import math
+import pmmlcg
+
+# Numba is optional: without it the kernel runs as plain Python, which still
+# avoids the method dispatch and attribute lookups of the event loop.
+try:
+    from numba import njit
+    import numpy as np
+
+    JIT_AVAILABLE = True
+except ImportError:
+    JIT_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+MODULUS = pmmlcg.MODULUS
+MULT = pmmlcg.MULT
+
+# variate sources
+DEMAND_SIZE = 0
+INTERDEMAND = 1
+LAG = 2
+
+@njit(cache = True)
+def __uniform__(states, source_state, source_antithetic, source):
+    """
+    pmmlcg.lcgrand inlined: one step of the generator of the state the
+    source draws from (MULT * z stays below 2^62, so it fits an int64).
+    """
+    k = source_state[source]
+    z = states[k] * MULT % MODULUS
+    states[k] = z
+
+    u = ((z >> 7) | 1) / 16777216.0
+
+    return 1.0 - u if source_antithetic[source] else u
+
+@njit(cache = True)
+def simulate_policy(initial_inventory_level, num_months, mean_interdemand, setup_cost, incremental_cost, holding_cost, shortage_cost, minlag, maxlag, prob_distrib, smalls, bigs, states, source_state, source_antithetic):
+    """
+    Simulate one (smalls, bigs) policy exactly like
+    SingleProductInventorySystem.evaluate_policy, as a single function over
+    plain scalars and arrays, and return the average total, ordering,
+    holding and shortage costs per month.
+
+    states holds the generator states the variates are drawn from (updated
+    in place); the demand sizes, inter-demand times and delivery lags draw
+    from states[source_state[DEMAND_SIZE]], states[source_state[INTERDEMAND]]
+    and states[source_state[LAG]], using 1 - u instead of u where
+    source_antithetic is set.
+
+    The event list is the original four-slot time_next_event array: a new
+    order replaces an outstanding one, and simultaneous events are handled
+    in increasing order of event type, as with the event calendar.
+    """
+    num_values = len(prob_distrib)
+
+    sim_time = 0.0
+    inventory_level = initial_inventory_level
+    time_last_event = 0.0
+    amount_ordered = 0
+
+    total_ordering_cost = 0.0
+    area_holding = 0.0
+    area_shortage = 0.0
+
+    # order arrival, demand, end of simulation, evaluation
+    time_order_arrival = 1.0e30
+    time_demand = sim_time - mean_interdemand * math.log(__uniform__(states, source_state, source_antithetic, INTERDEMAND))
+    time_end = float(num_months)
+    time_evaluate = 0.0
+
+    while True:
+        # timing (strict comparisons, so ties go to the lower event type)
+        next_event_type = 1
+        sim_time = time_order_arrival
+        if time_demand < sim_time:
+            next_event_type = 2
+            sim_time = time_demand
+        if time_end < sim_time:
+            next_event_type = 3
+            sim_time = time_end
+        if time_evaluate < sim_time:
+            next_event_type = 4
+            sim_time = time_evaluate
+
+        # update time-average statistical accumulators
+        time_since_last_event = sim_time - time_last_event
+        time_last_event = sim_time
+
+        if inventory_level < 0:
+            area_shortage -= inventory_level * time_since_last_event
+        elif inventory_level > 0:
+            area_holding += inventory_level * time_since_last_event
+
+        if next_event_type == 1:
+            inventory_level += amount_ordered
+            time_order_arrival = 1.0e30
+        elif next_event_type == 2:
+            u = __uniform__(states, source_state, source_antithetic, DEMAND_SIZE)
+            i = 1
+            while u > prob_distrib[i - 1] and i < num_values:
+                i += 1
+            inventory_level -= i
+
+            time_demand = sim_time - mean_interdemand * math.log(__uniform__(states, source_state, source_antithetic, INTERDEMAND))
+        elif next_event_type == 3:
+            break
+        else:
+            if inventory_level < smalls:
+                amount_ordered = bigs - inventory_level
+                total_ordering_cost += setup_cost + incremental_cost * amount_ordered
+
+                time_order_arrival = sim_time + (minlag + (maxlag - minlag) * __uniform__(states, source_state, source_antithetic, LAG))
+
+            time_evaluate = sim_time + 1.0
+
+    avg_ordering_cost = total_ordering_cost / num_months
+    avg_holding_cost = holding_cost * area_holding / num_months
+    avg_shortage_cost = shortage_cost * area_shortage / num_months
+    avg_total_cost = avg_ordering_cost + avg_holding_cost + avg_shortage_cost
+
+    return avg_total_cost, avg_ordering_cost, avg_holding_cost, avg_shortage_cost
+
+def make_arrays(streams : list, antithetic : list) -> tuple:
+    """
+    Return (states, source_state, source_antithetic) for simulate_policy
+    given the pmmlcg stream and antithetic flag of each variate source.
+    Sources on the same stream share one state. The arrays are NumPy arrays
+    when the kernel is compiled and lists otherwise.
+    """
+    unique = sorted(set(streams))
+    states = [pmmlcg.lcgrandgt(stream) for stream in unique]
+    source_state = [unique.index(stream) for stream in streams]
+
+    if JIT_AVAILABLE:
+        return np.array(states, dtype = np.int64), np.array(source_state, dtype = np.int64), np.array(antithetic, dtype = np.bool_)
+
+    return states, source_state, list(antithetic)
+
+def store_states(streams : list, states):
+    """
+    Write the states advanced by simulate_policy back to pmmlcg.
+    """
+    for stream, z in zip(sorted(set(streams)), states):
+        pmmlcg.lcgrandst(int(z), stream)
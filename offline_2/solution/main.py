@@ -1,7 +1,20 @@
 from single_product_inventory_system import SingleProductInventorySystem
+from profiler import EventProfiler
+import os
 import sys
+import pmmlcg
+import rand
+import result_cache
 
-if __name__ == "__main__":
+# source files the results depend on (see cache_key)
+SOURCES = ["main.py", "single_product_inventory_system.py", "rand.py", "pmmlcg.py", "event_calendar.py", "stats.py", "inventory_kernel.py"]
+
+def parse_input(input_filename : str) -> list:
+    """
+    Read an input file and return the arguments of
+    SingleProductInventorySystem in order. Raises ValueError if the file
+    cannot be read or is malformed.
+    """
     initial_inventory_level = 0
     num_months = 0
     num_policies = 0
@@ -17,13 +30,6 @@ if __name__ == "__main__":
     small_policies = []
     big_policies = []
 
-    # take input filename from command line
-    if len(sys.argv) != 2:
-        print("Usage: python main.py <input_filename>")
-        exit(1)
-
-    input_filename = sys.argv[1]
-
     try:
         with open(input_filename, "r") as f:
             line = f.readline()
@@ -57,10 +63,108 @@ if __name__ == "__main__":
                 inputs = line[i].split(" ")
                 small_policies.append(int(inputs[0]))
                 big_policies.append(int(inputs[1]))
-    except:
-        print("Error reading input file")
+    except (OSError, ValueError, IndexError) as e:
+        raise ValueError(f"Error reading input file {input_filename}: {e}")
+
+    return [initial_inventory_level, num_months, num_policies, num_values_demand, mean_interdemand, setup_cost, incremental_cost, holding_cost, shortage_cost, minlag, maxlag, prob_distrib_demand, small_policies, big_policies]
+
+def read_input(input_filename : str) -> list:
+    """
+    Same as parse_input, but prints the error to stderr and exits if the
+    file is malformed.
+    """
+    try:
+        return parse_input(input_filename)
+    except ValueError as e:
+        print(e, file = sys.stderr)
+        exit(1)
+
+def cache_key(mode : str, params : list) -> str:
+    """
+    Return the result cache key of a run of the given mode and parameters
+    (the input arguments and run options), seeded from the current state of
+    stream 1.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    version = result_cache.code_version(*[os.path.join(directory, filename) for filename in SOURCES])
+
+    return result_cache.make_key("inventory/" + mode, params, [pmmlcg.lcgrandgt(1)], version)
+
+if __name__ == "__main__":
+    # take input filename (and optionally the number of worker processes and
+    # replications per policy, or a common random numbers comparison) from
+    # command line, "profile" to write an instrumented run's summary to
+    # profile.json, or "checkpoint" to save the run to checkpoint.pkl every
+    # so many events ("resume" finishes it, checkpointing as it was started)
+    usage = "Usage: python main.py <input_filename> [workers [num_replications]] [options]\n" \
+            "       python main.py <input_filename> compare <num_replications> [antithetic] [options]\n" \
+            "       python main.py <input_filename> profile [options]\n" \
+            "       python main.py <input_filename> checkpoint <events> [options]\n" \
+            "       python main.py resume [checkpoint_filename]\n" \
+            "Options: --variates=scalar|pool|pool-reproducible (draw variates one at a time or from a rand.VariatePool)\n" \
+            "         --pool-size=<variates per refill> (default 4096)\n" \
+            "         --backend=python|compiled"
+
+    # options can follow any form; the rest are positional
+    variates_mode = "scalar"
+    pool_size = 4096
+    backend = "python"
+    argv = []
+    try:
+        for arg in sys.argv:
+            if arg.startswith("--variates="):
+                variates_mode = arg.split("=", 1)[1]
+            elif arg.startswith("--pool-size="):
+                pool_size = int(arg.split("=", 1)[1])
+            elif arg.startswith("--backend="):
+                backend = arg.split("=", 1)[1]
+            else:
+                argv.append(arg)
+    except ValueError:
+        argv = []
+
+    if variates_mode not in ["scalar", "pool", "pool-reproducible"] or pool_size <= 0 or backend not in ["python", "compiled"]:
+        argv = []
+
+    if len(argv) in [2, 3] and argv[1] == "resume":
+        SingleProductInventorySystem.resume(argv[2] if len(argv) > 2 else "checkpoint.pkl").run()
+        exit(0)
+
+    compare = len(argv) > 2 and argv[2] == "compare"
+    profile = len(argv) == 3 and argv[2] == "profile"
+    checkpoint = len(argv) == 4 and argv[2] == "checkpoint"
+
+    if len(argv) < 2 or (compare and len(argv) not in [4, 5]) or (not compare and len(argv) > 4):
+        print(usage)
         exit(1)
 
-    spis = SingleProductInventorySystem(initial_inventory_level, num_months, num_policies, num_values_demand, mean_interdemand, setup_cost, incremental_cost, holding_cost, shortage_cost, minlag, maxlag, prob_distrib_demand, small_policies, big_policies)
+    input_filename = argv[1]
+    antithetic = compare and len(argv) > 4 and argv[4] == "antithetic"
+    workers = 1 if compare or profile or checkpoint or len(argv) < 3 else int(argv[2])
+    num_replications = int(argv[3]) if len(argv) > 3 and not checkpoint else 1
+    checkpoint_every = int(argv[3]) if checkpoint else 0
+
+    variates = None if variates_mode == "scalar" else rand.VariatePool(pool_size, reproducible = variates_mode == "pool-reproducible")
+
+    args = read_input(input_filename)
+    spis = SingleProductInventorySystem(*args, variates = variates, backend = backend, profiler = EventProfiler() if profile else None)
+
+    # profiled and checkpointed runs are never served from the cache; the
+    # results do not depend on the number of workers or the backend, so
+    # neither does the key
+    cache = result_cache.default_cache() if not (profile or checkpoint) else None
+    if cache is not None:
+        mode = "compare" if compare else "sequential" if workers == 1 and num_replications == 1 else "replicated"
+        key = cache_key(mode, args + [num_replications, antithetic, variates_mode] + ([pool_size] if variates is not None else []))
+
+        if cache.get_files(key, [spis.output_filename]):
+            print("Results from cache", file = sys.stderr)
+            exit(0)
+
+    if compare:
+        spis.compare_policies(num_replications, antithetic)
+    else:
+        spis.run(workers, num_replications, checkpoint_every)
 
-    spis.run()
\ No newline at end of file
+    if cache is not None:
+        cache.put_files(key, [spis.output_filename])
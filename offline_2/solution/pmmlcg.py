@@ -56,4 +56,126 @@ def lcgrandgt(stream : int) -> int:
     -----------
         stream: the stream whose zrng is to be returned
     """
-    return zrng[stream]
\ No newline at end of file
+    return zrng[stream]
+
+# lcgrand applies MULT1 and then MULT2, so one step of the generator is a
+# multiplication by their product modulo MODULUS.
+MULT = MULT1 * MULT2 % MODULUS
+
+# Cached powers MULT^1, MULT^2, ..., MULT^k (mod MODULUS) used by lcgrand_block.
+_mult_powers = None
+
+def __mult_powers__(n : int):
+    """
+    Return a NumPy array holding MULT^1, ..., MULT^n (mod MODULUS).
+
+    The table is built by doubling, so only O(log n) vectorized passes are
+    needed, and it is cached so later calls with n no larger than the biggest
+    block so far are a plain slice.
+    """
+    import numpy as np
+
+    global _mult_powers
+
+    if _mult_powers is None:
+        _mult_powers = np.array([MULT], dtype=np.int64)
+
+    while len(_mult_powers) < n:
+        # every entry is below 2^31, so the products fit in a signed 64-bit int
+        k = len(_mult_powers)
+        _mult_powers = np.concatenate((_mult_powers, _mult_powers * _mult_powers[k - 1] % MODULUS))
+
+    return _mult_powers[:n]
+
+def lcgrand_block(stream : int, n : int):
+    """
+    Return a NumPy array holding the next n variates of stream "stream".
+
+    The result is bit-identical to n successive calls to lcgrand(stream) and
+    zrng[stream] is advanced past the block, so scalar and block draws can be
+    mixed freely.
+
+    Parameters:
+    -----------
+        stream: the stream to draw from
+        n: the number of variates to draw
+    """
+    import numpy as np
+
+    if n <= 0:
+        return np.empty(0, dtype=np.float64)
+
+    z = zrng[stream] * __mult_powers__(n) % MODULUS
+    zrng[stream] = int(z[-1])
+
+    return ((z >> 7) | 1) / 16777216.0
+
+def skip(stream : int, k : int):
+    """
+    Advance stream "stream" by k variates without generating them.
+
+    MULT^k (mod MODULUS) is found by modular exponentiation, so the cost is
+    O(log k) regardless of how far the stream is moved.
+
+    Parameters:
+    -----------
+        stream: the stream to advance
+        k: the number of variates to skip
+    """
+    zrng[stream] = zrng[stream] * pow(MULT, k, MODULUS) % MODULUS
+
+def spawn(n_streams : int, spacing : int = 100000, stream : int = 1) -> list:
+    """
+    Create n_streams new streams and return their indices into zrng.
+
+    The i-th new stream (i = 1, ..., n_streams) starts i * spacing variates
+    ahead of the current position of stream "stream", so as long as no
+    stream draws more than spacing variates, none of them (nor stream
+    "stream" itself) overlap.
+
+    Stream "stream" is not advanced, so a second spawn from the same
+    position returns the same starting points, and the new streams stay in
+    zrng until the caller deletes them (del zrng[streams[0]:] once they are
+    the last ones). Callers that only need seeds should use split instead.
+
+    Parameters:
+    -----------
+        n_streams: the number of streams to create
+        spacing: the number of variates between the starts of two streams
+        stream: the stream the new streams are split from
+    """
+    jump = pow(MULT, spacing, MODULUS)
+    zi = zrng[stream]
+    streams = []
+
+    for _ in range(n_streams):
+        zi = zi * jump % MODULUS
+        zrng.append(zi)
+        streams.append(len(zrng) - 1)
+
+    return streams
+
+def split(n_streams : int, spacing : int = 100000, stream : int = 1) -> list:
+    """
+    Return the seeds of n_streams streams placed like those of spawn and
+    advance stream "stream" past all of them (by (n_streams + 1) * spacing
+    variates), so the next split, spawn or draw from it never reuses them.
+    Nothing is added to zrng; seed a stream with lcgrandst to draw from one.
+
+    Parameters:
+    -----------
+        n_streams: the number of seeds to return
+        spacing: the number of variates between the starts of two streams
+        stream: the stream the seeds are split from
+    """
+    jump = pow(MULT, spacing, MODULUS)
+    zi = zrng[stream]
+    seeds = []
+
+    for _ in range(n_streams):
+        zi = zi * jump % MODULUS
+        seeds.append(zi)
+
+    skip(stream, (n_streams + 1) * spacing)
+
+    return seeds
@@ -0,0 +1,90 @@
+from single_product_inventory_system import SingleProductInventorySystem
+from main import read_input
+import math
+import sys
+import stats
+
+def successive_halving(system : SingleProductInventorySystem, budget : int, eta : int = 2, confidence : float = 0.95) -> list:
+    """
+    Search the policies of system for the one with the lowest average total
+    cost, spending at most about budget policy simulations.
+
+    Every round gives each surviving policy an equal share of that round's
+    budget (at least one more replication) and then keeps the best 1 / eta
+    of them, so clearly bad policies are dropped after a few replications
+    and the contenders get most of the budget. Replication r of every policy
+    uses the same common random numbers (see evaluate_policy_crn), so the
+    policies are ranked on the same demands.
+
+    Returns the policies of the last round, best first, as
+    ((smalls, bigs), mean, half_width, num_replications) tuples, and the
+    number of simulations actually used.
+    """
+    policies = list(zip(system.small_policies, system.big_policies))
+    num_rounds = max(1, math.ceil(math.log(len(policies)) / math.log(eta)))
+
+    # total_costs[policy] holds its total cost in replications 0, 1, ...
+    total_costs = {policy: [] for policy in policies}
+    survivors = policies
+    num_simulations = 0
+
+    for _ in range(num_rounds):
+        target = len(total_costs[survivors[0]]) + max(1, budget // (num_rounds * len(survivors)))
+
+        for policy in survivors:
+            while len(total_costs[policy]) < target:
+                r = len(total_costs[policy])
+                total_costs[policy].append(system.evaluate_policy_crn(policy[0], policy[1], r)[0])
+                num_simulations += 1
+
+        survivors.sort(key = lambda policy: sum(total_costs[policy]) / len(total_costs[policy]))
+
+        if len(survivors) == 1:
+            break
+
+        survivors = survivors[:max(1, math.ceil(len(survivors) / eta))]
+
+    ranking = []
+    for policy in survivors:
+        mean, half_width = stats.confidence_interval(total_costs[policy], confidence)
+        ranking.append((policy, mean, half_width, len(total_costs[policy])))
+
+    ranking.sort(key = lambda result: result[1])
+
+    return ranking, num_simulations
+
+def report(system : SingleProductInventorySystem, ranking : list, num_simulations : int, budget : int):
+    system.__init_report__(cost_table = False)
+
+    with open(system.output_filename, 'a') as out:
+        out.write(f"Successive halving: {num_simulations} simulations (budget {budget})\n")
+        out.write("------------------------------------------------------------------------\n")
+        out.write("                 Average     Half\n")
+        out.write("  Policy       total cost    width   Replications\n")
+        out.write("------------------------------------------------------------------------\n")
+
+        for (smalls, bigs), mean, half_width, num_replications in ranking:
+            out.write(f"\n({smalls:3d},{bigs:3d}){mean:15.2f}{half_width:9.2f}{num_replications:15d}\n")
+
+if __name__ == "__main__":
+    # the policies of the input file are replaced by the grid
+    # smalls = smin, smin + step, ..., smax and bigs = bmin, ..., bmax (smalls < bigs)
+    if len(sys.argv) != 8:
+        print("Usage: python policy_search.py <input_filename> <smin> <smax> <bmin> <bmax> <step> <budget>")
+        exit(1)
+
+    smin, smax, bmin, bmax, step, budget = map(int, sys.argv[2:])
+    policies = [(smalls, bigs) for smalls in range(smin, smax + 1, step) for bigs in range(bmin, bmax + 1, step) if smalls < bigs]
+
+    if not policies:
+        print("The grid has no policies with smalls < bigs")
+        exit(1)
+
+    args = read_input(sys.argv[1])
+    args[2] = len(policies)
+    args[12] = [smalls for smalls, _ in policies]
+    args[13] = [bigs for _, bigs in policies]
+
+    spis = SingleProductInventorySystem(*args)
+    ranking, num_simulations = successive_halving(spis, budget)
+    report(spis, ranking, num_simulations, budget)
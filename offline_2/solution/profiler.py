@@ -0,0 +1,145 @@
+import json
+import time
+import pmmlcg
+
+class EventProfiler:
+    """
+    Opt-in instrumentation for the event loops: number of events of each
+    type, cumulative wall time of each handler and of any other function
+    wrapped with wrap(), random variates drawn per pmmlcg stream and events
+    per second.
+
+    The simulation classes take a profiler as an optional argument and only
+    switch to their instrumented loop when one is given, so leaving it out
+    costs nothing. Times are inclusive: a handler's time contains the time
+    of the wrapped functions it calls (variate draws, trace writes, ...),
+    and the timer calls themselves slow the profiled run down, so the
+    numbers are for comparing parts of a run, not for absolute speed.
+    """
+
+    def __init__(self, filename : str = "profile.json"):
+        self.filename = filename
+
+        self.num_events = 0
+        self.event_counts = {}
+        self.calls = {}
+        self.times = {}
+        self.rng_draws = {}
+        self.wall_time = 0.0
+
+        self.depth = 0
+        self.time_started = 0.0
+        self.wrapped = []
+
+    def __record__(self, label : str, elapsed : float):
+        self.calls[label] = self.calls.get(label, 0) + 1
+        self.times[label] = self.times.get(label, 0.0) + elapsed
+
+    def call(self, label : str, function, *args):
+        """
+        Call function(*args) and add its wall time under label.
+        """
+        start = time.perf_counter()
+        result = function(*args)
+        self.__record__(label, time.perf_counter() - start)
+
+        return result
+
+    def dispatch(self, label : str, handler, *args):
+        """
+        Same as call, for the handler of an event, which is also counted as
+        an event of type label.
+        """
+        self.num_events += 1
+        self.event_counts[label] = self.event_counts.get(label, 0) + 1
+
+        return self.call(label, handler, *args)
+
+    def wrap(self, owner, attribute : str, label : str = None):
+        """
+        Time every call to owner.attribute (a function of a module or a
+        method of an object) under label until stop().
+        """
+        if label is None:
+            label = attribute
+
+        original = getattr(owner, attribute)
+        # bound methods live on the class, so for objects the wrapper is an
+        # instance attribute that stop() deletes again
+        had_own = attribute in getattr(owner, "__dict__", {})
+
+        def timed(*args):
+            return self.call(label, original, *args)
+
+        setattr(owner, attribute, timed)
+        self.wrapped.append((owner, attribute, original, had_own))
+
+    def __count_draws__(self):
+        # pmmlcg is used through its module attributes everywhere, so
+        # replacing them counts every draw (timed under "lcgrand")
+        lcgrand = pmmlcg.lcgrand
+        lcgrand_block = pmmlcg.lcgrand_block
+        draws = self.rng_draws
+
+        def counted_lcgrand(stream):
+            draws[stream] = draws.get(stream, 0) + 1
+            return lcgrand(stream)
+
+        def counted_lcgrand_block(stream, n):
+            draws[stream] = draws.get(stream, 0) + max(0, n)
+            return lcgrand_block(stream, n)
+
+        pmmlcg.lcgrand = counted_lcgrand
+        pmmlcg.lcgrand_block = counted_lcgrand_block
+        self.wrapped.append((pmmlcg, "lcgrand_block", lcgrand_block, True))
+        self.wrapped.append((pmmlcg, "lcgrand", lcgrand, True))
+        self.wrap(pmmlcg, "lcgrand")
+
+    def start(self):
+        """
+        Start (or, if already started, nest) a profiled section.
+        """
+        self.depth += 1
+        if self.depth > 1:
+            return
+
+        self.__count_draws__()
+        self.time_started = time.perf_counter()
+
+    def stop(self):
+        """
+        End a profiled section; the outermost stop() undoes all wrapping.
+        """
+        self.depth -= 1
+        if self.depth > 0:
+            return
+
+        self.wall_time += time.perf_counter() - self.time_started
+
+        # restore in reverse order, so functions wrapped twice end up original
+        for owner, attribute, original, had_own in reversed(self.wrapped):
+            if had_own:
+                setattr(owner, attribute, original)
+            else:
+                delattr(owner, attribute)
+
+        self.wrapped = []
+
+    def summary(self) -> dict:
+        return {
+            "wall_time": self.wall_time,
+            "events": self.num_events,
+            "events_per_second": self.num_events / self.wall_time if self.wall_time > 0 else 0.0,
+            "event_counts": self.event_counts,
+            "calls": self.calls,
+            "times": self.times,
+            "rng_draws": {str(stream): count for stream, count in sorted(self.rng_draws.items())}
+        }
+
+    def write(self, filename : str = None):
+        """
+        Write summary() as JSON to filename (self.filename by default).
+        """
+        with open(filename or self.filename, "w") as f:
+            json.dump(self.summary(), f, indent = 4)
+            f.write("\n")
@@ -1,5 +1,6 @@
 import pmmlcg
 import math
+import bisect
 
 def expon(mean : float) -> float:
     return -mean * math.log(pmmlcg.lcgrand(1))
@@ -22,4 +23,143 @@ def random_integer(prob_distrib : list) -> int:
     while u > prob_distrib[i - 1] and i < len(prob_distrib):
         i += 1
 
-    return i
\ No newline at end of file
+    return i
+
+
+class VariateStream:
+    """
+    Same interface as the functions above, but drawing from its own pmmlcg
+    stream, and optionally antithetic: every uniform u is replaced by 1 - u,
+    so a run on an antithetic stream is negatively correlated with the run on
+    the same stream without it.
+    """
+
+    def __init__(self, stream : int, antithetic : bool = False):
+        self.stream = stream
+        self.antithetic = antithetic
+
+    def __next_uniform__(self) -> float:
+        u = pmmlcg.lcgrand(self.stream)
+        return 1.0 - u if self.antithetic else u
+
+    def expon(self, mean : float) -> float:
+        return -mean * math.log(self.__next_uniform__())
+
+    def uniform(self, a : float, b : float) -> float:
+        """
+        Return a uniform random value between a and b inclusive.
+        """
+        return a + (b - a) * self.__next_uniform__()
+
+    def random_integer(self, prob_distrib : list) -> int:
+        """
+        Return a random integer between 1 and num_values inclusive, with the
+        probability of each value i (i = 1, ..., num_values) being equal to
+        prob_distrib[i - 1].
+        """
+        return min(bisect.bisect_left(prob_distrib, self.__next_uniform__()) + 1, len(prob_distrib))
+
+class VariatePool:
+    """
+    Hands out exponential, uniform and discrete variates from pre-drawn
+    buffers, so the per-draw cost is a list lookup instead of an lcgrand call.
+
+    In reproducible mode all three distributions share one buffer of
+    uniforms and each draw transforms the next uniform exactly like the
+    scalar functions above, so the sequence of values is identical to
+    calling expon, uniform and random_integer directly. Otherwise each
+    distribution keeps its own buffer that is transformed in bulk (vectorized
+    log and searchsorted), which is faster but consumes the stream in a
+    different order.
+
+    Either way the pool draws ahead of what it has handed out, so nothing
+    else should draw from the pool's stream while it is in use, and after
+    reseeding the stream the pool must be reset so it stops handing out
+    variates drawn from the old seed.
+    """
+
+    def __init__(self, size : int = 4096, reproducible : bool = False, stream : int = 1):
+        """
+        Parameters:
+        ----------
+            size: the number of variates drawn per refill
+            reproducible: whether to reproduce the scalar sequence of draws
+            stream: the pmmlcg stream to draw from
+        """
+        assert size > 0
+
+        self.size = size
+        self.reproducible = reproducible
+        self.stream = stream
+
+        self.uniforms = []
+        self.uniform_index = 0
+        self.exponentials = []
+        self.exponential_index = 0
+        self.integers = {}
+
+    def reset(self):
+        """
+        Discard every buffered variate, so the next draw starts from the
+        current position of the stream.
+        """
+        self.uniforms = []
+        self.uniform_index = 0
+        self.exponentials = []
+        self.exponential_index = 0
+        self.integers = {}
+
+    def __next_uniform__(self) -> float:
+        if self.uniform_index == len(self.uniforms):
+            self.uniforms = pmmlcg.lcgrand_block(self.stream, self.size).tolist()
+            self.uniform_index = 0
+
+        u = self.uniforms[self.uniform_index]
+        self.uniform_index += 1
+
+        return u
+
+    def expon(self, mean : float) -> float:
+        if self.reproducible:
+            return -mean * math.log(self.__next_uniform__())
+
+        if self.exponential_index == len(self.exponentials):
+            import numpy as np
+
+            self.exponentials = (-np.log(pmmlcg.lcgrand_block(self.stream, self.size))).tolist()
+            self.exponential_index = 0
+
+        x = self.exponentials[self.exponential_index]
+        self.exponential_index += 1
+
+        return mean * x
+
+    def uniform(self, a : float, b : float) -> float:
+        """
+        Return a uniform random value between a and b inclusive.
+        """
+        return a + (b - a) * self.__next_uniform__()
+
+    def random_integer(self, prob_distrib : list) -> int:
+        """
+        Return a random integer between 1 and num_values inclusive, with the
+        probability of each value i (i = 1, ..., num_values) being equal to
+        prob_distrib[i - 1].
+        """
+        if self.reproducible:
+            return min(bisect.bisect_left(prob_distrib, self.__next_uniform__()) + 1, len(prob_distrib))
+
+        # one buffer per distribution, keyed by its (cumulative) probabilities
+        key = tuple(prob_distrib)
+        values, index = self.integers.get(key, ([], 0))
+
+        if index == len(values):
+            import numpy as np
+
+            u = pmmlcg.lcgrand_block(self.stream, self.size)
+            values = np.minimum(np.searchsorted(key, u, side="left") + 1, len(key)).tolist()
+            index = 0
+
+        self.integers[key] = (values, index + 1)
+
+        return values[index]
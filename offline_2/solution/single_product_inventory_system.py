@@ -1,6 +1,15 @@
+import sys
 import rand
+import pmmlcg
+import stats
+import checkpointing
+from event_calendar import EventCalendar
+
+# attributes holding a source of random variates
+VARIATE_SOURCES = ("variates", "demand_size_variates", "interdemand_variates", "lag_variates")
+
 class SingleProductInventorySystem:
-    def __init__(self, initial_inventory_level : int, num_months : int, num_policies : int, num_values_demand : int, mean_interdemand : float, setup_cost : float, incremental_cost : float, holding_cost : float, shortage_cost : float, minlag : float, maxlag : float, prob_distrib_demand : list, small_policies : list, big_policies : list, output_filename : str = "out.txt"):
+    def __init__(self, initial_inventory_level : int, num_months : int, num_policies : int, num_values_demand : int, mean_interdemand : float, setup_cost : float, incremental_cost : float, holding_cost : float, shortage_cost : float, minlag : float, maxlag : float, prob_distrib_demand : list, small_policies : list, big_policies : list, output_filename : str = "out.txt", variates = None, backend : str = "python", profiler = None):
         # input validation
         assert len(prob_distrib_demand) == num_values_demand
         assert len(small_policies) == num_policies and len(big_policies) == num_policies
@@ -13,6 +22,8 @@ class SingleProductInventorySystem:
         for i in range(num_policies):
             assert small_policies[i] <= big_policies[i]
 
+        assert backend in ["python", "compiled"]
+
         # class variables
         self.num_events = 4
         self.initial_inventory_level = initial_inventory_level
@@ -32,6 +43,43 @@ class SingleProductInventorySystem:
 
         self.output_filename = output_filename
 
+        # "compiled" runs each policy as one inventory_kernel.simulate_policy
+        # call (JIT-compiled when Numba is installed) whenever the variate
+        # sources allow it
+        self.backend = backend
+
+        # source of random variates: the scalar functions of the rand module
+        # by default, or anything with the same interface (e.g. rand.VariatePool)
+        self.variates = rand if variates is None else variates
+
+        # sources of the demand sizes, inter-demand times and delivery lags;
+        # all the same source except when comparing policies with common
+        # random numbers
+        self.demand_size_variates = self.variates
+        self.interdemand_variates = self.variates
+        self.lag_variates = self.variates
+
+        # optional profiler.EventProfiler: if given, the policies are
+        # simulated with an instrumented loop and run() writes the profile
+        # summary at the end (None runs the plain event loop)
+        self.profiler = profiler
+
+        # progress of a sequential run (see run), kept so a checkpointed run
+        # can be resumed: the policy being simulated (None outside run) and
+        # whether its simulation is under way
+        self.current_policy = None
+        self.policy_started = False
+
+        # checkpoint settings of a sequential run (see run), saved with the
+        # checkpoints so a resumed run keeps checkpointing the same way
+        self.checkpoint_every = 0
+        self.checkpoint_filename = "checkpoint.pkl"
+
+        # streams and seeds for common random numbers (see __crn_seeds__)
+        self.crn_anchor = None
+        self.crn_streams = []
+        self.crn_seeds = []
+
     def __init_sim_vars__(self):
         # simulation clock
         self.sim_time = 0.0
@@ -40,22 +88,22 @@ class SingleProductInventorySystem:
         self.inventory_level = self.initial_inventory_level
         self.time_last_event = 0.0
         self.next_event_type = 0
+        self.next_event_data = None
+        self.order_arrival_event = None
+        self.total_events_occurred = 0
 
         # statistical counters
         self.total_ordering_cost = 0.0
         self.area_holding = 0.0
         self.area_shortage = 0.0
 
-        # event list
-        self.time_next_event = [
-            None,
-            1.0e30,
-            self.sim_time + rand.expon(self.mean_interdemand),
-            self.num_months,
-            0.0
-        ]
+        # event list (an order arrival is only scheduled once an order is placed)
+        self.event_calendar = EventCalendar()
+        self.event_calendar.schedule(self.sim_time + self.interdemand_variates.expon(self.mean_interdemand), 2)
+        self.event_calendar.schedule(self.num_months, 3)
+        self.event_calendar.schedule(0.0, 4)
 
-    def __init_report__(self):
+    def __init_report__(self, cost_table : bool = True):
         with open(self.output_filename, 'w') as out:
             out.write("------Single-Product Inventory System------\n\n")
             out.write(f"Initial Inventory Level: {self.initial_inventory_level} items\n\n")
@@ -70,6 +118,10 @@ class SingleProductInventorySystem:
             out.write(f"Length of the simulation: {self.num_months} months\n\n")
             out.write(f"K ={self.setup_cost:6.1f}\ni ={self.incremental_cost:6.1f}\nh ={self.holding_cost:6.1f}\npi ={self.shortage_cost:6.1f}\n\n")
             out.write(f"Number of policies: {self.num_policies}\n\n")
+
+            if not cost_table:
+                return
+
             out.write("------------------------------------------------------------------------\n")
             out.write("                 Average        Average")
             out.write("        Average        Average\n")
@@ -78,19 +130,12 @@ class SingleProductInventorySystem:
             out.write("------------------------------------------------------------------------\n")
 
     def __timing__(self):
-        min_time_next_event = 1.0e+29
-        self.next_event_type = 0
-
-        for i in range(1, self.num_events + 1):
-            if self.time_next_event[i] < min_time_next_event:
-                min_time_next_event = self.time_next_event[i]
-                self.next_event_type = i
-
-        if self.next_event_type == 0:
-            print(f"Event list empty at time {self.sim_time}")
+        if len(self.event_calendar) == 0:
+            print(f"Event list empty at time {self.sim_time}", file = sys.stderr)
             exit(1)
 
-        self.sim_time = min_time_next_event
+        self.total_events_occurred += 1
+        self.sim_time, self.next_event_type, self.next_event_data = self.event_calendar.pop()
 
     def __update_time_avg_stats__(self):
         time_since_last_event = self.sim_time - self.time_last_event
@@ -103,15 +148,15 @@ class SingleProductInventorySystem:
             self.area_holding += self.inventory_level * time_since_last_event
 
     def __order_arrival__(self):
-        self.inventory_level += self.amount_ordered
-
-        self.time_next_event[1] = 1.0e+30
+        # the amount ordered travels with the event
+        self.inventory_level += self.next_event_data
+        self.order_arrival_event = None
 
     def __demand_occurs__(self):
-        demand = rand.random_integer(self.prob_distrib_demand)
+        demand = self.demand_size_variates.random_integer(self.prob_distrib_demand)
         self.inventory_level -= demand
 
-        self.time_next_event[2] = self.sim_time + rand.expon(self.mean_interdemand)
+        self.event_calendar.schedule(self.sim_time + self.interdemand_variates.expon(self.mean_interdemand), 2)
 
     def __evaluate__(self):
         #  Check whether the inventory level is less than smalls.
@@ -119,41 +164,437 @@ class SingleProductInventorySystem:
             self.amount_ordered = self.bigs - self.inventory_level
             self.total_ordering_cost += self.setup_cost + self.incremental_cost * self.amount_ordered
 
-            self.time_next_event[1] = self.sim_time + rand.uniform(self.minlag, self.maxlag)
-        
-        self.time_next_event[4] = self.sim_time + 1.0
+            # as in the original single-slot event list, a new order replaces
+            # an outstanding one that has not arrived yet
+            if self.order_arrival_event is not None:
+                self.event_calendar.cancel(self.order_arrival_event)
 
-    def __report__(self):
+            self.order_arrival_event = self.event_calendar.schedule(self.sim_time + self.lag_variates.uniform(self.minlag, self.maxlag), 1, self.amount_ordered)
+
+        self.event_calendar.schedule(self.sim_time + 1.0, 4)
+
+    def __costs__(self) -> tuple:
+        """
+        Return the average total, ordering, holding and shortage costs per
+        month of the policy just simulated.
+        """
         avg_ordering_cost = self.total_ordering_cost / self.num_months
         avg_holding_cost = self.holding_cost * self.area_holding / self.num_months
         avg_shortage_cost = self.shortage_cost * self.area_shortage / self.num_months
         avg_total_cost = avg_ordering_cost + avg_holding_cost + avg_shortage_cost
 
+        return avg_total_cost, avg_ordering_cost, avg_holding_cost, avg_shortage_cost
+
+    def __report__(self, smalls : int, bigs : int, costs : tuple):
+        avg_total_cost, avg_ordering_cost, avg_holding_cost, avg_shortage_cost = costs
+
         with open(self.output_filename, 'a') as out:
-            out.write(f"\n({self.smalls:3d},{self.bigs:3d}){avg_total_cost:15.2f}{avg_ordering_cost:15.2f}{avg_holding_cost:15.2f}{avg_shortage_cost:15.2f}\n")
+            out.write(f"\n({smalls:3d},{bigs:3d}){avg_total_cost:15.2f}{avg_ordering_cost:15.2f}{avg_holding_cost:15.2f}{avg_shortage_cost:15.2f}\n")
 
-    def run(self):
-        self.__init_report__()
+    def evaluate_policy(self, smalls : int, bigs : int) -> tuple:
+        """
+        Simulate the (smalls, bigs) policy for num_months months and return
+        its average total, ordering, holding and shortage costs per month.
+        """
+        if self.profiler is not None:
+            return self.__evaluate_profiled__(smalls, bigs)
 
-        for i in range(self.num_policies):
-            self.smalls = self.small_policies[i]
-            self.bigs = self.big_policies[i]
-            self.__init_sim_vars__()
+        if self.backend == "compiled":
+            costs = self.__evaluate_compiled__(smalls, bigs)
+            if costs is not None:
+                return costs
 
-            while (True):
-                # determine the next event
-                self.__timing__()
+        self.smalls = smalls
+        self.bigs = bigs
+        self.__init_sim_vars__()
+
+        return self.__simulate__()
+
+    def __simulate__(self, checkpoint_every : int = 0, checkpoint_filename : str = "checkpoint.pkl") -> tuple:
+        """
+        Run the event loop of the current policy until the end of the
+        simulation and return its costs, calling
+        checkpoint(checkpoint_filename) every checkpoint_every events if
+        checkpoint_every > 0.
+        """
+        while (True):
+            # determine the next event
+            self.__timing__()
 
-                # update time-average statistical accumulators
-                self.__update_time_avg_stats__()
+            # update time-average statistical accumulators
+            self.__update_time_avg_stats__()
+
+            # invoke the appropriate event function
+            if self.next_event_type == 1:
+                self.__order_arrival__()
+            elif self.next_event_type == 2:
+                self.__demand_occurs__()
+            elif self.next_event_type == 3:
+                return self.__costs__()
+            elif self.next_event_type == 4:
+                self.__evaluate__()
+
+            if checkpoint_every > 0 and self.total_events_occurred % checkpoint_every == 0:
+                self.checkpoint(checkpoint_filename)
+
+    def __evaluate_profiled__(self, smalls : int, bigs : int) -> tuple:
+        """
+        Same as evaluate_policy, with every step timed by self.profiler. The
+        compiled backend is timed as a whole, and its draws are not counted.
+        """
+        p = self.profiler
+        p.start()
+
+        try:
+            if self.backend == "compiled":
+                costs = p.call("__evaluate_compiled__", self.__evaluate_compiled__, smalls, bigs)
+                if costs is not None:
+                    return costs
+
+            self.smalls = smalls
+            self.bigs = bigs
+            p.call("__init_sim_vars__", self.__init_sim_vars__)
+            p.wrap(self.event_calendar, "schedule", "event_calendar.schedule")
+            p.wrap(self.event_calendar, "cancel", "event_calendar.cancel")
+
+            while (True):
+                p.call("__timing__", self.__timing__)
+                p.call("__update_time_avg_stats__", self.__update_time_avg_stats__)
 
-                # invoke the appropriate event function
                 if self.next_event_type == 1:
-                    self.__order_arrival__()
+                    p.dispatch("__order_arrival__", self.__order_arrival__)
                 elif self.next_event_type == 2:
-                    self.__demand_occurs__()
+                    p.dispatch("__demand_occurs__", self.__demand_occurs__)
                 elif self.next_event_type == 3:
-                    self.__report__()
-                    break
+                    return p.dispatch("__costs__", self.__costs__)
                 elif self.next_event_type == 4:
-                    self.__evaluate__()
+                    p.dispatch("__evaluate__", self.__evaluate__)
+        finally:
+            p.stop()
+
+    def __evaluate_compiled__(self, smalls : int, bigs : int) -> tuple:
+        """
+        Evaluate the policy with inventory_kernel.simulate_policy, which
+        produces the same costs and leaves the streams in the same state as
+        the event loop. Returns None if a variate source is not one the
+        kernel can reproduce (the rand module or a rand.VariateStream).
+        """
+        streams = []
+        antithetic = []
+        for source in [self.demand_size_variates, self.interdemand_variates, self.lag_variates]:
+            if source is rand:
+                streams.append(1)
+                antithetic.append(False)
+            elif isinstance(source, rand.VariateStream):
+                streams.append(source.stream)
+                antithetic.append(source.antithetic)
+            else:
+                return None
+
+        # imported here, as it pulls in Numba when installed
+        import inventory_kernel
+
+        states, source_state, source_antithetic = inventory_kernel.make_arrays(streams, antithetic)
+        prob_distrib = inventory_kernel.np.array(self.prob_distrib_demand, dtype = float) if inventory_kernel.JIT_AVAILABLE else self.prob_distrib_demand
+
+        costs = inventory_kernel.simulate_policy(self.initial_inventory_level, self.num_months, self.mean_interdemand, self.setup_cost, self.incremental_cost, self.holding_cost, self.shortage_cost, self.minlag, self.maxlag, prob_distrib, smalls, bigs, states, source_state, source_antithetic)
+        inventory_kernel.store_states(streams, states)
+
+        return costs
+
+    def __getstate__(self):
+        # modules cannot be pickled, so the default variate source is
+        # restored by __setstate__ instead
+        state = self.__dict__.copy()
+        state["profiler"] = None
+        for key in VARIATE_SOURCES:
+            if state[key] is rand:
+                state[key] = None
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for key in VARIATE_SOURCES:
+            if getattr(self, key) is None:
+                setattr(self, key, rand)
+
+    def checkpoint(self, path : str):
+        """
+        Save the full state of the run (policy in progress, clock, event
+        calendar, accumulators, variate sources, pmmlcg streams and how much
+        of the output file was written) to path.
+        """
+        checkpointing.save(path, self, [self.output_filename])
+
+    @classmethod
+    def resume(cls, path : str):
+        """
+        Load a run saved by checkpoint, restoring the pmmlcg streams and
+        cutting the output file back to the checkpoint. Calling run() on the
+        result finishes the run exactly as if it had never stopped.
+
+        Raises TypeError, leaving the streams and file alone, if path holds
+        something other than a cls.
+        """
+        return checkpointing.load(path, cls)
+
+    def run(self, workers : int = 1, num_replications : int = 1, checkpoint_every : int = None, checkpoint_filename : str = None):
+        """
+        Simulate every policy and write one row per policy to the output file.
+
+        With the defaults the policies run one after another in this process,
+        all drawing from stream 1. Otherwise every replication of every
+        policy draws from its own stream, split from stream 1 with
+        pmmlcg.split, and runs on a pool of worker processes (in this process
+        if workers = 1; workers = None uses every core). Each row then holds
+        the costs averaged over num_replications replications, and the
+        results do not depend on the number of workers.
+
+        In a sequential run (the defaults), checkpoint_every > 0 calls
+        checkpoint(checkpoint_filename) every checkpoint_every events and
+        after every policy; policies on the compiled backend are only
+        checkpointed between policies. A run restored with resume continues
+        from its checkpoint. Checkpoint arguments left as None keep the
+        settings the run had (no checkpoints and checkpoint.pkl for a new
+        run), so a resumed run goes on checkpointing like the one that was
+        saved.
+
+        With a profiler, its summary is written once all policies are done.
+        Worker processes run without it, so a parallel run only profiles the
+        work done in this process.
+        """
+        if checkpoint_every is not None:
+            self.checkpoint_every = checkpoint_every
+        if checkpoint_filename is not None:
+            self.checkpoint_filename = checkpoint_filename
+
+        if self.profiler is not None:
+            self.profiler.start()
+
+        try:
+            self.__run__(workers, num_replications, self.checkpoint_every, self.checkpoint_filename)
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+                self.profiler.write()
+
+    def __run__(self, workers : int, num_replications : int, checkpoint_every : int, checkpoint_filename : str):
+        report = self.__report__
+        if self.profiler is not None:
+            report = lambda *args: self.profiler.call("__report__", self.__report__, *args)
+
+        if workers == 1 and num_replications == 1:
+            if self.current_policy is None:
+                self.__init_report__()
+                self.current_policy = 0
+                self.policy_started = False
+
+            while self.current_policy < self.num_policies:
+                smalls = self.small_policies[self.current_policy]
+                bigs = self.big_policies[self.current_policy]
+
+                if self.policy_started:
+                    # resumed in the middle of this policy
+                    costs = self.__simulate__(checkpoint_every, checkpoint_filename)
+                elif checkpoint_every > 0 and self.backend == "python" and self.profiler is None:
+                    self.smalls = smalls
+                    self.bigs = bigs
+                    self.__init_sim_vars__()
+                    self.policy_started = True
+                    costs = self.__simulate__(checkpoint_every, checkpoint_filename)
+                else:
+                    costs = self.evaluate_policy(smalls, bigs)
+
+                report(smalls, bigs, costs)
+
+                self.current_policy += 1
+                self.policy_started = False
+                if checkpoint_every > 0:
+                    self.checkpoint(checkpoint_filename)
+
+            self.current_policy = None
+            return
+
+        assert self.current_policy is None and checkpoint_every == 0, "only sequential runs can be checkpointed"
+
+        self.__init_report__()
+
+        for i, costs in enumerate(self.replicate_policies(num_replications, workers)):
+            report(self.small_policies[i], self.big_policies[i], costs)
+
+    def replicate_policies(self, num_replications : int, workers : int = 1) -> list:
+        """
+        Return, for every policy, its average total, ordering, holding and
+        shortage costs per month averaged over num_replications
+        replications, each drawing from its own stream split from stream 1
+        with pmmlcg.split. Stream 1 is advanced past them, so successive
+        calls run independent replications. The replications run on a pool
+        of worker processes (in this process if workers = 1; workers = None
+        uses every core), and the results do not depend on the number of
+        workers.
+        """
+        # enough variates for about two per demand and one per month, with room to spare
+        spacing = max(100000, int(4 * self.num_months * (2.0 / self.mean_interdemand + 1.0)))
+        assert num_replications > 0, "at least one replication is needed"
+        assert self.num_policies * num_replications * spacing < pmmlcg.MODULUS - 1, "replications would overlap: generator period exceeded"
+
+        seeds = pmmlcg.split(self.num_policies * num_replications, spacing)
+        tasks = []
+        for i in range(self.num_policies):
+            for r in range(num_replications):
+                tasks.append((self, self.small_policies[i], self.big_policies[i], seeds[i * num_replications + r]))
+
+        if workers == 1:
+            # the replications reseed stream 1 in this process, so put it
+            # back where split left it
+            parent = pmmlcg.lcgrandgt(1)
+            results = list(map(__evaluate_policy__, tasks))
+            pmmlcg.lcgrandst(parent, 1)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers = workers) as executor:
+                results = list(executor.map(__evaluate_policy__, tasks, chunksize = max(1, len(tasks) // 64)))
+
+        # results come back in task order, so the costs keep the policy order
+        costs = []
+        for i in range(self.num_policies):
+            replications = results[i * num_replications:(i + 1) * num_replications]
+            costs.append(tuple(sum(c[k] for c in replications) / num_replications for k in range(4)))
+
+        return costs
+
+    def __reseed__(self, seed : int, stream : int):
+        """
+        Seed pmmlcg stream "stream" and reset the rand.VariatePool sources
+        drawing from it, whose buffers still hold variates of the old seed.
+        """
+        pmmlcg.lcgrandst(seed, stream)
+
+        for key in VARIATE_SOURCES:
+            source = getattr(self, key)
+            if isinstance(source, rand.VariatePool) and source.stream == stream:
+                source.reset()
+
+    def __crn_seeds__(self, num_seed_sets : int):
+        """
+        Make sure seeds for the three common random number streams of
+        replications 0, ..., num_seed_sets - 1 exist. They are split off
+        (lazily, as more replications are needed) from a private anchor
+        stream, so later replications never overlap earlier ones.
+        """
+        # enough variates for about one per demand (per stream), with room to spare
+        spacing = max(100000, int(4 * self.num_months * (1.0 / self.mean_interdemand + 1.0)))
+
+        if self.crn_anchor is None:
+            self.crn_anchor = pmmlcg.spawn(1, spacing)[0]
+
+        needed = 3 * num_seed_sets - len(self.crn_streams)
+        if needed <= 0:
+            return
+
+        assert (len(self.crn_streams) + needed + 1) * spacing < pmmlcg.MODULUS - 1, "replications would overlap: generator period exceeded"
+
+        streams = pmmlcg.spawn(needed, spacing, self.crn_anchor)
+        pmmlcg.skip(self.crn_anchor, needed * spacing)
+
+        self.crn_streams += streams
+        self.crn_seeds += [pmmlcg.lcgrandgt(stream) for stream in streams]
+
+    def evaluate_policy_crn(self, smalls : int, bigs : int, replication : int, antithetic : bool = False) -> tuple:
+        """
+        Same as evaluate_policy, but with common random numbers: the demand
+        sizes, inter-demand times and delivery lags come from three dedicated
+        streams that are reset to the seeds of the given replication, so every
+        policy evaluated for the same replication sees the same demands. With
+        antithetic = True every uniform u is replaced by 1 - u. The three
+        streams are read through rand.VariateStream sources for the run, so
+        a rand.VariatePool given as variates never shifts the pairing.
+        """
+        self.__crn_seeds__(replication + 1)
+
+        streams = self.crn_streams[3 * replication:3 * replication + 3]
+        for stream, seed in zip(streams, self.crn_seeds[3 * replication:3 * replication + 3]):
+            self.__reseed__(seed, stream)
+
+        self.demand_size_variates = rand.VariateStream(streams[0], antithetic)
+        self.interdemand_variates = rand.VariateStream(streams[1], antithetic)
+        self.lag_variates = rand.VariateStream(streams[2], antithetic)
+
+        try:
+            return self.evaluate_policy(smalls, bigs)
+        finally:
+            self.demand_size_variates = self.interdemand_variates = self.lag_variates = self.variates
+
+    def compare_policies(self, num_replications : int, antithetic : bool = False, confidence : float = 0.95) -> list:
+        """
+        Compare the policies with common random numbers and write a
+        paired-difference report to the output file.
+
+        The demand sizes, inter-demand times and delivery lags each come
+        from a dedicated stream, and every policy starts replication r from
+        the same three seeds, so all policies see the same demands. The
+        total cost of each policy is then compared with that of the policy
+        with the lowest mean cost through the differences within each
+        replication, which are much less noisy than independent runs.
+
+        With antithetic = True, the replications come in pairs that share
+        seeds, the second one using 1 - u for every uniform u; each pair
+        counts as one observation (its average), so num_replications must
+        be even.
+
+        Returns a list with, for each policy, its (mean, half_width) total
+        cost and (mean, half_width) difference from the best policy.
+        """
+        assert num_replications > 1
+        assert not antithetic or num_replications % 2 == 0
+
+        num_seed_sets = num_replications // 2 if antithetic else num_replications
+
+        # total_costs[i][r] is the total cost of policy i in replication (or pair) r
+        total_costs = [[] for _ in range(self.num_policies)]
+
+        for i in range(self.num_policies):
+            for r in range(num_seed_sets):
+                costs = [self.evaluate_policy_crn(self.small_policies[i], self.big_policies[i], r)[0]]
+                if antithetic:
+                    costs.append(self.evaluate_policy_crn(self.small_policies[i], self.big_policies[i], r, antithetic = True)[0])
+
+                total_costs[i].append(sum(costs) / len(costs))
+
+        intervals = [stats.confidence_interval(costs, confidence) for costs in total_costs]
+        best = min(range(self.num_policies), key = lambda i: intervals[i][0])
+
+        results = []
+        for i in range(self.num_policies):
+            differences = [c - b for c, b in zip(total_costs[i], total_costs[best])]
+            difference = stats.confidence_interval(differences, confidence) if i != best else (0.0, 0.0)
+            results.append((intervals[i], difference))
+
+        self.__init_report__(cost_table = False)
+        with open(self.output_filename, 'a') as out:
+            out.write(f"Common random numbers: {num_replications} replications{' (antithetic pairs)' if antithetic else ''}, {confidence:.2f} confidence\n")
+            out.write(f"Differences are from the best policy ({self.small_policies[best]:3d},{self.big_policies[best]:3d})\n")
+            out.write("------------------------------------------------------------------------\n")
+            out.write("                 Average     Half       Average     Half\n")
+            out.write("  Policy       total cost    width    difference    width\n")
+            out.write("------------------------------------------------------------------------\n")
+
+            for i in range(self.num_policies):
+                (mean, half_width), (difference, difference_half_width) = results[i]
+                out.write(f"\n({self.small_policies[i]:3d},{self.big_policies[i]:3d}){mean:15.2f}{half_width:9.2f}{difference:14.2f}{difference_half_width:9.2f}\n")
+
+        return results
+
+
+def __evaluate_policy__(args : tuple) -> tuple:
+    """
+    Evaluate one policy with stream 1 seeded to the given seed. Runs in a
+    worker process of SingleProductInventorySystem.run.
+    """
+    system, smalls, bigs, seed = args
+
+    system.__reseed__(seed, 1)
+
+    return system.evaluate_policy(smalls, bigs)
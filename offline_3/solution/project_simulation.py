@@ -0,0 +1,233 @@
+import csv
+import math
+import sys
+import numpy as np
+import stats
+
+# the two projects of the assignment (the T1 and T2 sheets of
+# project_simulation.xlsx): deadline and (task, predecessors, a, m, b) rows
+PROJECTS = {
+    "1": (60.0, [
+        ("D", [], 5, 6, 7),
+        ("E", ["D"], 7, 7, 7),
+        ("F", ["D"], 5, 8, 13),
+        ("G", ["D"], 3, 8, 14),
+        ("H", ["E"], 8, 9, 10),
+        ("I", ["F", "G"], 6, 8, 10),
+        ("J", ["H"], 10, 13, 15),
+        ("K", ["I"], 5, 5, 5),
+        ("L", ["I"], 11, 13, 16),
+        ("M", ["J"], 9, 10, 12),
+        ("N", ["L"], 3, 4, 7),
+        ("O", ["K", "M", "N"], 12, 14, 17)
+    ]),
+    "2": (36.0, [
+        ("A", [], 3.5, 4.75, 6.25),
+        ("B", ["A"], 5, 6, 7),
+        ("C", ["A"], 4.3, 4.3, 4.3),
+        ("D", ["B"], 3, 4, 6),
+        ("E", ["B"], 7.4, 8.7, 9.6),
+        ("F", ["C"], 7, 9, 11),
+        ("G", ["C"], 3.2, 4.4, 5.6),
+        ("H", ["D", "E", "F"], 5.1, 7.3, 9.9),
+        ("I", ["F", "G"], 8, 9, 10),
+        ("J", ["H", "I"], 2.4, 2.4, 2.4),
+        ("K", ["I"], 2.2, 2.8, 5.2),
+        ("L", ["J", "K"], 3.3, 5.5, 7.8)
+    ])
+}
+
+# T: triangular(a, m, b), RT: right triangular(a, b), LT: left triangular(a, b)
+DISTRIBUTIONS = ["T", "RT", "LT"]
+
+def read_network(filename : str) -> list:
+    """
+    Read an activity network from a CSV file with a header row and the
+    columns task, predecessors, a, m, b, where predecessors is a list of
+    tasks separated by commas or spaces (empty for none).
+    """
+    tasks = []
+
+    with open(filename, newline = "") as f:
+        reader = csv.reader(f)
+        next(reader)
+
+        for row in reader:
+            if not row:
+                continue
+
+            task, predecessors, a, m, b = row
+            tasks.append((task.strip(), predecessors.replace(",", " ").split(), float(a), float(m), float(b)))
+
+    return tasks
+
+def topological_order(tasks : list) -> list:
+    """
+    Return the indices of tasks sorted so that every task comes after its
+    predecessors (Kahn's algorithm). Raises ValueError for an unknown
+    predecessor or a cycle.
+    """
+    index = {task[0]: i for i, task in enumerate(tasks)}
+    num_predecessors = [len(task[1]) for task in tasks]
+    successors = [[] for _ in tasks]
+
+    for i, (name, predecessors, _, _, _) in enumerate(tasks):
+        for predecessor in predecessors:
+            if predecessor not in index:
+                raise ValueError(f"task {name} has the unknown predecessor {predecessor}")
+            successors[index[predecessor]].append(i)
+
+    order = [i for i in range(len(tasks)) if num_predecessors[i] == 0]
+    for i in order:
+        for j in successors[i]:
+            num_predecessors[j] -= 1
+            if num_predecessors[j] == 0:
+                order.append(j)
+
+    if len(order) != len(tasks):
+        raise ValueError("the activity network has a cycle")
+
+    return order
+
+def sample_durations(a : np.ndarray, m : np.ndarray, b : np.ndarray, n : int, distribution : str, rng : np.random.Generator) -> np.ndarray:
+    """
+    Return an (n x tasks) matrix of activity durations, drawn like the
+    spreadsheet does:
+
+    T:  triangular(a, m, b) by inversion, a + sqrt((b - a)(m - a)U) if
+        U < (m - a) / (b - a) and b - sqrt((b - a)(b - m)(1 - U)) otherwise
+    RT: right triangular, a + (b - a) max(U1, U2)
+    LT: left triangular, a + (b - a) (1 - max(U1, U2))
+
+    Tasks with a == b always take a.
+    """
+    width = b - a
+
+    if distribution == "T":
+        u = rng.random((n, len(a)))
+        # a constant task has width 0, so any split point gives a
+        split = np.divide(m - a, width, out = np.zeros_like(width), where = width > 0)
+
+        return np.where(u < split, a + np.sqrt(width * (m - a) * u), b - np.sqrt(width * (b - m) * (1.0 - u)))
+
+    u = np.maximum(rng.random((n, len(a))), rng.random((n, len(a))))
+    if distribution == "LT":
+        u = 1.0 - u
+
+    return a + width * u
+
+def simulate(tasks : list, num_replications : int, distribution : str = "T", deadline : float = None, seed : int = 13, batch_size : int = 100000, confidence : float = 0.95) -> dict:
+    """
+    Simulate num_replications executions of the project given by tasks
+    (the (task, predecessors, a, m, b) rows of the activity network).
+
+    Each batch of replications is one (replications x tasks) duration matrix;
+    a pass over the tasks in topological order gives every finish time as
+    the maximum finish time of the predecessors plus the duration, and a
+    backward pass marks the critical tasks: those finishing at the project
+    completion time or exactly when a critical successor starts.
+
+    Returns the completion times of all replications (a NumPy array) and
+    their mean with its confidence interval, standard deviation and
+    percentiles, the criticality index of every task (the fraction of
+    replications in which it is critical) and, if deadline is given, the
+    probability of finishing by the deadline with its confidence interval.
+    """
+    assert distribution in DISTRIBUTIONS
+
+    order = topological_order(tasks)
+    index = {task[0]: i for i, task in enumerate(tasks)}
+    predecessors = [[index[p] for p in task[1]] for task in tasks]
+    successors = [[] for _ in tasks]
+    for i in range(len(tasks)):
+        for p in predecessors[i]:
+            successors[p].append(i)
+
+    a = np.array([task[2] for task in tasks], dtype = float)
+    m = np.array([task[3] for task in tasks], dtype = float)
+    b = np.array([task[4] for task in tasks], dtype = float)
+    assert np.all(a <= m) and np.all(m <= b), "every task needs a <= m <= b"
+
+    rng = np.random.default_rng(seed)
+    completion_times = np.empty(num_replications)
+    critical_counts = np.zeros(len(tasks))
+
+    for start in range(0, num_replications, batch_size):
+        n = min(batch_size, num_replications - start)
+        durations = sample_durations(a, m, b, n, distribution, rng)
+
+        start_times = np.zeros((n, len(tasks)))
+        finish_times = np.empty((n, len(tasks)))
+        for j in order:
+            if predecessors[j]:
+                start_times[:, j] = finish_times[:, predecessors[j]].max(axis = 1)
+            finish_times[:, j] = start_times[:, j] + durations[:, j]
+
+        completion = finish_times.max(axis = 1)
+
+        critical = np.zeros((n, len(tasks)), dtype = bool)
+        for j in reversed(order):
+            critical[:, j] = finish_times[:, j] == completion
+            for s in successors[j]:
+                critical[:, j] |= critical[:, s] & (finish_times[:, j] == start_times[:, s])
+
+        completion_times[start:start + n] = completion
+        critical_counts += critical.sum(axis = 0)
+
+    # stats.confidence_interval on NumPy reductions, for millions of values
+    mean = float(completion_times.mean())
+    std = float(completion_times.std(ddof = 1)) if num_replications > 1 else 0.0
+    z = stats.t_quantile(0.5 + confidence / 2.0, max(1, num_replications - 1))
+    half_width = z * std / math.sqrt(num_replications) if num_replications > 1 else math.inf
+
+    results = {
+        "completion_times": completion_times,
+        "mean": (mean, half_width),
+        "std": std,
+        "percentiles": {p: float(np.percentile(completion_times, p)) for p in [50, 90, 95, 99, 99.9]},
+        "criticality": {task[0]: critical_counts[i] / num_replications for i, task in enumerate(tasks)}
+    }
+
+    if deadline is not None:
+        # normal approximation for the binomial proportion
+        p = float(np.mean(completion_times <= deadline))
+        results["success_rate"] = (p, z * math.sqrt(p * (1.0 - p) / num_replications))
+
+    return results
+
+def report(results : dict, tasks : list, distribution : str, deadline : float = None):
+    n = len(results["completion_times"])
+    mean, half_width = results["mean"]
+
+    print(f"Distribution: {distribution}, replications: {n}")
+    print(f"Mean project finish time: {mean:.4f} +/- {half_width:.4f} (std {results['std']:.4f})")
+
+    for p, value in results["percentiles"].items():
+        print(f"  {p:5}th percentile: {value:.4f}")
+
+    if deadline is not None:
+        rate, rate_half_width = results["success_rate"]
+        print(f"Success rate (deadline {deadline:g}): {rate:.4f} +/- {rate_half_width:.4f}")
+
+    print("Criticality index:")
+    for task in tasks:
+        print(f"  {task[0]:>4}: {results['criticality'][task[0]]:.4f}")
+
+if __name__ == "__main__":
+    # <project> is 1 or 2 for the projects of the assignment or a CSV file
+    # (task, predecessors, a, m, b) with the deadline given separately
+    if len(sys.argv) not in [4, 5] or sys.argv[2] not in DISTRIBUTIONS:
+        print("Usage: python project_simulation.py <1|2|network.csv> <T|RT|LT> <num_replications> [deadline]")
+        exit(1)
+
+    if sys.argv[1] in PROJECTS:
+        deadline, tasks = PROJECTS[sys.argv[1]]
+    else:
+        deadline, tasks = None, read_network(sys.argv[1])
+
+    if len(sys.argv) == 5:
+        deadline = float(sys.argv[4])
+
+    distribution = sys.argv[2]
+    results = simulate(tasks, int(sys.argv[3]), distribution, deadline)
+    report(results, tasks, distribution, deadline)
@@ -0,0 +1,100 @@
+import csv
+import os
+import sys
+
+# the queue models live in the offline 1 solution
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "offline_1", "solution"))
+
+import single_server_queue
+import lindley
+
+STATISTICS = ["average_delay", "average_number_in_queue", "server_utilization"]
+
+def mm1_expected_delay(mean_interarrival : float, mean_service : float) -> float:
+    """
+    Return the steady-state expected delay in queue of the M/M/1 queue,
+    rho * mean_service / (1 - rho).
+    """
+    rho = mean_service / mean_interarrival
+    return rho * mean_service / (1.0 - rho) if rho < 1.0 else float("inf")
+
+def sweep(rhos : list, mean_interarrival : float, num_delays_required : int, n_reps : int, engine : str = "event", workers : int = None, confidence : float = 0.95) -> list:
+    """
+    Run n_reps replications of the single-server queue for every traffic
+    intensity in rhos (the mean service time is rho * mean_interarrival) and
+    return one row (a dict) per rho with the confidence interval of every
+    statistic and the M/M/1 steady-state expected delay.
+
+    engine is "event" for single_server_queue.replicate (replications run on
+    a pool of workers processes) or "batch" for lindley.simulate_batch.
+    Both advance stream 1 past the streams they use, so every rho gets its
+    own independent replications.
+
+    Note that the runs start empty and idle and last num_delays_required
+    customers, so for rho close to 1 the simulated average delay is below
+    the steady-state value until num_delays_required is large.
+    """
+    assert engine in ["event", "batch"]
+
+    rows = []
+    for rho in rhos:
+        mean_service = rho * mean_interarrival
+
+        if engine == "event":
+            results = single_server_queue.replicate(mean_interarrival, mean_service, num_delays_required, n_reps, workers, confidence)
+        else:
+            results = lindley.simulate_batch(mean_interarrival, mean_service, num_delays_required, n_reps, confidence)
+
+        row = {
+            "rho": rho,
+            "mean_interarrival": mean_interarrival,
+            "mean_service": mean_service,
+            "num_customers": num_delays_required,
+            "replications": n_reps,
+            "engine": engine,
+            "confidence": confidence
+        }
+        for key in STATISTICS:
+            row[key], row[key + "_half_width"] = results[key]
+
+        row["mm1_expected_delay"] = mm1_expected_delay(mean_interarrival, mean_service)
+        row["relative_error"] = (row["average_delay"] - row["mm1_expected_delay"]) / row["mm1_expected_delay"] if rho > 0 else 0.0
+
+        rows.append(row)
+        print(f"rho = {rho:.4f}: average delay {row['average_delay']:.6f} +/- {row['average_delay_half_width']:.6f} (M/M/1: {row['mm1_expected_delay']:.6f})")
+
+    return rows
+
+def write_rows(filename : str, rows : list):
+    """
+    Write the rows as a CSV file, or as a Parquet file if filename ends in
+    .parquet (which needs pandas with a Parquet engine installed).
+    """
+    if filename.endswith(".parquet"):
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("writing Parquet needs pandas (and pyarrow or fastparquet); use a .csv output file instead")
+
+        pd.DataFrame(rows).to_parquet(filename, index = False)
+        return
+
+    with open(filename, "w", newline = "") as f:
+        writer = csv.DictWriter(f, fieldnames = list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 7 or sys.argv[2] not in ["event", "batch"]:
+        print("Usage: python delay_sweep.py <output_file (.csv or .parquet, e.g. delay_sweep.csv)> <event|batch> <mean_interarrival> <num_customers> <n_reps> <rho> [<rho> ...]")
+        exit(1)
+
+    output_filename = sys.argv[1]
+    engine = sys.argv[2]
+    mean_interarrival = float(sys.argv[3])
+    num_delays_required = int(sys.argv[4])
+    n_reps = int(sys.argv[5])
+    rhos = list(map(float, sys.argv[6:]))
+
+    rows = sweep(rhos, mean_interarrival, num_delays_required, n_reps, engine)
+    write_rows(output_filename, rows)
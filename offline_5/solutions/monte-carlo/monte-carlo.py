@@ -1,7 +1,61 @@
-import numpy as np
-from tqdm import tqdm
+from __future__ import annotations
+import functools
+import result_cache
+# numpy and tqdm are imported where they are used, so importing this module stays cheap
 
-np.random.seed(13)
+SEED = 13
+
+def _multiply_truncated(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+  """
+  Multiplies two power series given by their first len(a) coefficients, keeping only those coefficients. Uses an FFT for long series.
+  """
+  import numpy as np
+
+  n = len(a)
+
+  if n <= 256:
+    return np.convolve(a, b)[:n]
+
+  size = 1 << (2 * n - 1).bit_length()
+  product = np.fft.irfft(np.fft.rfft(a, size) * np.fft.rfft(b, size), size)[:n]
+
+  # rounding errors can make (near) zero probabilities slightly negative
+  return np.maximum(product, 0.0)
+
+@functools.lru_cache(maxsize=None)
+def _exact_generation_probs(p: float, q: float, max_offsprings: int, max_population: int, generations: int) -> np.ndarray:
+  """
+  Computes P[generation g has j individuals] for g = 1, ..., generations and j = 0, ..., max_population.
+
+  With f the probability generating function of the number of offsprings, the population of generation g has generating function
+  G_g = f(G_{g - 1}), G_0(s) = s. f is a polynomial, so G_g follows from a few products of power series, and truncating every series
+  after max_population + 1 coefficients leaves those coefficients exact.
+  """
+  import numpy as np
+
+  # same offspring distribution as MonteCarloSimulation.ps
+  ps = [p * (q ** (i - 1)) for i in range(1, max_offsprings + 1)]
+  ps.insert(0, 1 - sum(ps))
+
+  probs = np.zeros((generations, max_population + 1))
+  g = np.zeros(max_population + 1)
+  if max_population >= 1:
+    g[1] = 1.0
+
+  for gen in range(generations):
+    # f(G) by Horner's rule: ps[0] + G (ps[1] + G (ps[2] + ...))
+    f = np.zeros(max_population + 1)
+    f[0] = ps[-1]
+    for i in range(max_offsprings - 1, -1, -1):
+      f = _multiply_truncated(f, g)
+      f[0] += ps[i]
+
+    g = f
+    probs[gen] = g
+
+  probs.flags.writeable = False
+
+  return probs
 
 class MonteCarloSimulation:
   def _probability_of_i_offspring(self, i: int) -> float:
@@ -35,6 +89,10 @@ class MonteCarloSimulation:
 
     print(self.ps)
 
+    self.gen_probs = None
+    self.generations = None
+    self.exact_probs = None
+
   def generate_new_generation(self, n: int) -> int:
     """
     Generates a new generation of offsprings.
@@ -49,6 +107,8 @@ class MonteCarloSimulation:
     int
       The number of offsprings in the new generation
     """
+    import numpy as np
+
     n_new = 0
 
     for _ in range(n):
@@ -57,6 +117,9 @@ class MonteCarloSimulation:
     return n_new
 
   def simulate(self, generations: int, trials: int) -> float:
+    import numpy as np
+    from tqdm import tqdm
+
     self.generations = generations
     
     counts = np.zeros((generations, self.max_population + 1), dtype=int)
@@ -75,6 +138,72 @@ class MonteCarloSimulation:
 
     self.gen_probs = counts / trials
 
+  def simulate_batched(self, generations: int, trials: int, batch_size: int = 1000000, seed: int = 13, max_tracked_population: int = 1 << 40) -> None:
+    """
+    Same as simulate, but advances all trials of a batch at once: the
+    offspring counts of the n individuals of a trial are drawn together as
+    one multinomial(n, ps) sample, so each generation takes a few NumPy calls
+    instead of one np.random.choice per individual. The estimates agree with
+    simulate in distribution, not sample by sample.
+
+    A trial whose population exceeds max_tracked_population is set to
+    max_tracked_population + 1 and no longer sampled. This keeps a
+    supercritical law from overflowing the int64 counts over long horizons.
+    Such a trial is never counted again, which changes nothing in practice:
+    falling back from there to max_population or below would take on the
+    order of max_tracked_population generations even for a critical law.
+
+    Parameters:
+    ----------
+    generations: int
+      Number of generations to simulate
+    trials: int
+      Number of trials
+    batch_size: int
+      Number of trials advanced together (bounds the memory used)
+    seed: int
+      Seed of the random generator
+    max_tracked_population: int
+      Largest population still sampled (at most 2^62 / max_offsprings)
+    """
+    import numpy as np
+
+    self.generations = generations
+
+    assert self.max_population < max_tracked_population <= (1 << 62) // max(self.max_offsprings, 1)
+
+    rng = np.random.default_rng(seed)
+    offsprings = np.arange(self.max_offsprings + 1)
+    counts = np.zeros((generations, self.max_population + 1), dtype=np.int64)
+    overgrown = max_tracked_population + 1
+
+    for start in range(0, trials, batch_size):
+      n = np.ones(min(batch_size, trials - start), dtype=np.int64)
+
+      for gen in range(generations):
+        # extinct and overgrown trials stay that way, so only the others need sampling
+        alive = np.flatnonzero((n > 0) & (n < overgrown))
+        n[alive] = rng.multinomial(n[alive], self.ps) @ offsprings
+        np.minimum(n, overgrown, out=n)
+
+        counts[gen] += np.bincount(n[n <= self.max_population], minlength=self.max_population + 1)
+
+    self.gen_probs = counts / trials
+
+  def exact(self, generations: int) -> None:
+    """
+    Computes the exact generation-size probabilities (see _exact_generation_probs) instead of estimating them. They are stored in
+    exact_probs, in the layout of gen_probs, and report prints them next to the simulated estimates. Results are cached, so repeating
+    the computation for the same parameters is free.
+    """
+    self.exact_probs = _exact_generation_probs(self.p, self.q, self.max_offsprings, self.max_population, generations)
+
+  def _exact_note(self, i: int, j: int) -> str:
+    if self.exact_probs is None or i >= len(self.exact_probs):
+      return ""
+
+    return f" (exact: {self.exact_probs[i, j]:.6f})"
+
   def report(self, filename: str = None) -> None:
     if (self.gen_probs is None) or (self.generations is None):
       raise ValueError("You must run the simulation first.")
@@ -84,14 +213,14 @@ class MonteCarloSimulation:
         for i in range(self.generations):
           f.write(f"Generation-{i + 1}:\n")
           for j in range(5):
-            f.write(f"P[{j}] = {self.gen_probs[i, j]}\n")
+            f.write(f"P[{j}] = {self.gen_probs[i, j]}{self._exact_note(i, j)}\n")
           
           f.write("\n")
     else:
       for i in range(self.generations):
         print(f"Generation-{i + 1}:")
         for j in range(5):
-          print(f"P[{j}] = {self.gen_probs[i, j]}")
+          print(f"P[{j}] = {self.gen_probs[i, j]}{self._exact_note(i, j)}")
         
         print()
 
@@ -100,6 +229,26 @@ if __name__ == "__main__":
   p = 0.2126
   q = 0.5893
 
+  generations = 10
+  trials = 100000
+
   sim = MonteCarloSimulation(p, q, 3, 4)
-  sim.simulate(10, 10000)
+
+  # the estimates only depend on the parameters, the seed and this file, so reruns are served from the result cache
+  cache = result_cache.default_cache()
+  key = result_cache.make_key("monte-carlo/simulate", [p, q, 3, 4, generations, trials], [SEED], result_cache.code_version(__file__))
+  gen_probs = cache.get(key) if cache is not None else None
+
+  if gen_probs is None:
+    import numpy as np
+
+    np.random.seed(SEED)
+    sim.simulate(generations, trials)
+    if cache is not None:
+      cache.put(key, sim.gen_probs)
+  else:
+    sim.gen_probs = gen_probs
+    sim.generations = generations
+
+  sim.exact(generations)
   sim.report("results.txt")
\ No newline at end of file
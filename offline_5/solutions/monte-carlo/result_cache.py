@@ -0,0 +1,159 @@
+"""
+On-disk cache of simulation results, shared by the solutions of offline 1,
+2 and 5.
+
+Every solution directory is self-contained and is run from inside itself,
+so, like pmmlcg.py, this module is copied into offline_1/solution,
+offline_2/solution, offline_5/solutions/monte-carlo and
+offline_5/solutions/secretary-problem. The copies must stay identical: make
+a change in one of them and copy the file over the other three (diff shows
+if they have drifted).
+"""
+import hashlib
+import json
+import os
+import pickle
+
+# environment variables: the cache directory ("off" or empty disables the
+# cache) and its size limit in megabytes
+DIRECTORY_VARIABLE = "SIM_CACHE_DIR"
+MAX_MB_VARIABLE = "SIM_CACHE_MAX_MB"
+
+DEFAULT_DIRECTORY = ".sim_cache"
+DEFAULT_MAX_MB = 256
+
+def code_version(*filenames) -> str:
+    """
+    Return a hash of the contents of the given source files, so results
+    cached by an older version of the code are never returned.
+    """
+    h = hashlib.sha256()
+    for filename in filenames:
+        with open(filename, "rb") as f:
+            h.update(f.read())
+
+    return h.hexdigest()
+
+def make_key(model : str, params, seeds, version : str) -> str:
+    """
+    Return the cache key of a run: a hash of the model name, its parameters,
+    the seeds of the random number streams it draws from and the code
+    version (see code_version). params and seeds can be anything JSON can
+    encode (other values are encoded by repr).
+    """
+    description = json.dumps({"model": model, "params": params, "seeds": seeds, "version": version}, sort_keys = True, default = repr)
+
+    return hashlib.sha256(description.encode()).hexdigest()
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of simulation results: every entry is
+    one pickle file named after its key in directory.
+
+    A hit refreshes the modification time of the entry, and after every
+    store the least recently used entries are deleted until the entries
+    take at most max_bytes.
+    """
+
+    def __init__(self, directory : str = DEFAULT_DIRECTORY, max_bytes : int = DEFAULT_MAX_MB << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok = True)
+
+    def __path__(self, key : str) -> str:
+        return os.path.join(self.directory, key + ".pkl")
+
+    def get(self, key : str):
+        """
+        Return the value stored under key, or None on a miss.
+        """
+        path = self.__path__(key)
+
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        os.utime(path)
+
+        return value
+
+    def put(self, key : str, value):
+        """
+        Store value (anything picklable) under key and evict old entries.
+        Values larger than the whole cache are not stored.
+        """
+        data = pickle.dumps(value, protocol = pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+
+        # write and rename, so readers never see a partial entry
+        path = self.__path__(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+        self.__evict__()
+
+    def __evict__(self):
+        entries = []
+        total = 0
+
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def get_files(self, key : str, filenames : list) -> bool:
+        """
+        On a hit, write the output files stored under key (by put_files)
+        back to disk and return True; return False on a miss.
+        """
+        files = self.get(key)
+        if files is None:
+            return False
+
+        for filename in filenames:
+            with open(filename, "wb") as f:
+                f.write(files[filename])
+
+        return True
+
+    def put_files(self, key : str, filenames : list):
+        """
+        Store the contents of the output files filenames under key.
+        """
+        files = {}
+        for filename in filenames:
+            with open(filename, "rb") as f:
+                files[filename] = f.read()
+
+        self.put(key, files)
+
+def default_cache():
+    """
+    Return the ResultCache set up by the SIM_CACHE_DIR and SIM_CACHE_MAX_MB
+    environment variables (by default .sim_cache, up to 256 MB), or None
+    if caching is turned off.
+    """
+    directory = os.environ.get(DIRECTORY_VARIABLE, DEFAULT_DIRECTORY)
+    if directory in ["", "off"]:
+        return None
+
+    max_mb = float(os.environ.get(MAX_MB_VARIABLE, DEFAULT_MAX_MB))
+
+    return ResultCache(directory, int(max_mb * (1 << 20)))
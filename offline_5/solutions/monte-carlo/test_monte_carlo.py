@@ -0,0 +1,36 @@
+import importlib.util
+import os
+
+import numpy as np
+
+# monte-carlo.py is not an importable module name, so load it by path
+_spec = importlib.util.spec_from_file_location("monte_carlo", os.path.join(os.path.dirname(os.path.abspath(__file__)), "monte-carlo.py"))
+monte_carlo = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(monte_carlo)
+
+
+def test_simulate_batched_supercritical_long_horizon():
+  # mean offspring count 1.375: without the cap the populations overflow int64 well before 200 generations
+  sim = monte_carlo.MonteCarloSimulation(0.5, 0.5, 3, 4)
+  generations = 200
+  trials = 20000
+
+  sim.simulate_batched(generations, trials, seed=1)
+  sim.exact(generations)
+
+  assert sim.gen_probs.shape == (generations, 5)
+  assert np.all(sim.gen_probs >= 0) and np.all(sim.gen_probs.sum(axis=1) <= 1)
+
+  # by now only extinct trials are counted: P[0] is the extinction probability, the rest vanish
+  p0 = sim.exact_probs[-1, 0]
+  assert abs(sim.gen_probs[-1, 0] - p0) < 4 * np.sqrt(p0 * (1 - p0) / trials)
+  assert np.all(sim.gen_probs[-1, 1:] == 0)
+
+
+def test_simulate_batched_overgrown_trials_are_not_counted():
+  # a cap just above max_population drops trials early; the counts must stay within the histogram
+  sim = monte_carlo.MonteCarloSimulation(0.5, 0.5, 3, 4)
+
+  sim.simulate_batched(50, 1000, seed=1, max_tracked_population=5)
+
+  assert np.all(sim.gen_probs.sum(axis=1) <= 1)
@@ -1,16 +1,10 @@
+from __future__ import annotations
 import sys 
-import numpy as np
-from tqdm import tqdm
+import functools
+import result_cache
+# numpy and tqdm are imported where they are used, so importing this module stays cheap
 
-if len(sys.argv) != 2:
-  print("Usage: python secretary-problem.py n")
-  sys.exit(1)
-
-n = int(sys.argv[1])
-
-if n < 1:
-  print("n must be greater than 0.")
-  sys.exit(1)
+SEED = 13
 
 def success_rate_m(n: int, m: int, s: int, trials: int) -> float:
   """
@@ -30,6 +24,8 @@ def success_rate_m(n: int, m: int, s: int, trials: int) -> float:
     float
       The success rate (in percentage)
   """
+  import numpy as np
+
   successes = 0
   for _ in range(trials):
     ranks = np.random.permutation(n)
@@ -46,6 +42,121 @@ def success_rate_m(n: int, m: int, s: int, trials: int) -> float:
 
   return (successes / trials) * 100
 
+def success_rates(n: int, ss: list, trials: int, batch_size: int = None) -> np.ndarray:
+  """
+    Calculates the success rates (in percentage) of every sample size m = 0, ..., n - 1 for every success threshold in ss at once.
+
+    The same permutations are shared by every (m, s). In a permutation, the candidate chosen after a sample of m >= 1 is the first candidate
+    at position >= m that is better than everyone before it (a prefix minimum), or the last candidate if there is none, so one pass of
+    np.minimum.accumulate finds the chosen candidate for every m.
+
+    Parameters:
+    ----------
+    n: int
+      The number of candidates
+    ss: list
+      Success thresholds
+    trials: int
+      The number of trials
+    batch_size: int
+      The number of permutations drawn at a time (by default about 10^7 ranks per batch)
+
+    Returns:
+    -------
+    np.ndarray
+      success_rates[i, m] is the success rate for threshold ss[i] and sample size m
+  """
+  import numpy as np
+  from tqdm import tqdm
+
+  if batch_size is None:
+    batch_size = max(1, 10000000 // n)
+
+  thresholds = np.array(ss).reshape(-1, 1, 1)
+  positions = np.arange(n)
+  successes = np.zeros((len(ss), n), dtype=np.int64)
+
+  for start in tqdm(range(0, trials, batch_size)):
+    b = min(batch_size, trials - start)
+    ranks = np.argsort(np.random.random((b, n)), axis=1)
+
+    # position i is a prefix minimum if it beats everyone before it
+    prefix_min = np.minimum.accumulate(ranks, axis=1)
+    is_record = np.zeros((b, n), dtype=bool)
+    is_record[:, 1:] = ranks[:, 1:] < prefix_min[:, :-1]
+
+    # next_record[:, m] is the first prefix minimum at position >= m (n if none)
+    next_record = np.where(is_record, positions, n)
+    next_record = np.minimum.accumulate(next_record[:, ::-1], axis=1)[:, ::-1]
+
+    # position n stands for "nobody was chosen", which falls back to the last candidate
+    ranks = np.concatenate((ranks, ranks[:, -1:]), axis=1)
+    chosen = np.take_along_axis(ranks, next_record, axis=1)
+    chosen[:, 0] = ranks[:, -1]
+
+    successes += (chosen[np.newaxis] <= thresholds).sum(axis=1)
+
+  return (successes / trials) * 100
+
+@functools.lru_cache(maxsize=None)
+def _tail_sums(n: int, s: int) -> tuple:
+  """
+    Returns T with T[m] = sum over i = m, ..., n - 1 of P[a candidate chosen at position i is within the threshold] / (i (i + 1)),
+    for m = 1, ..., n - 1 (T[0] is unused).
+
+    A candidate chosen at (0-based) position i is the best of the first i + 1 candidates, i.e. the minimum rank of a random (i + 1)-subset
+    of the n ranks. It is above the threshold s with probability r(i + 1) = C(n - 1 - s, i + 1) / C(n, i + 1), which follows the
+    recurrence r(0) = 1, r(k + 1) = r(k) (n - 1 - s - k) / (n - k).
+  """
+  tail = [0.0] * (n + 1)
+  r = [1.0] * (n + 1)
+  for k in range(n):
+    r[k + 1] = r[k] * max(n - 1 - s - k, 0) / (n - k)
+
+  for i in range(n - 1, 0, -1):
+    tail[i] = tail[i + 1] + (1 - r[i + 1]) / (i * (i + 1))
+
+  return tuple(tail)
+
+@functools.lru_cache(maxsize=None)
+def exact_success_rate(n: int, m: int, s: int) -> float:
+  """
+    Calculates the exact success rate (in percentage) of the rule simulated by success_rate_m: skip the first m candidates, then choose
+    the first one better than everyone seen so far (or the last candidate if there is none), succeeding if its rank is at most s.
+
+    After a sample of m >= 1, the candidate at position i >= m is chosen with probability m / (i (i + 1)): it must be the best of the
+    first i + 1 candidates (1 / (i + 1)) while the best of the first i is in the sample (m / i). Nobody is chosen with probability m / n,
+    and then the last candidate is uniformly one of the ranks 1, ..., n - 1.
+
+    Parameters:
+    ----------
+    n: int
+      The number of candidates
+    m: int
+      sample size (number of candidates to interview before making a decision)
+    s: int
+      Success threshold
+
+    Returns:
+    -------
+    float
+      The success rate (in percentage)
+  """
+  if m == 0:
+    return min(s + 1, n) / n * 100
+
+  last_within_threshold = min(s, n - 1) / (n - 1)
+
+  return (m * _tail_sums(n, s)[m] + m / n * last_within_threshold) * 100
+
+def exact_success_rates(n: int, ss: list) -> np.ndarray:
+  """
+    Calculates exact_success_rate for every success threshold in ss and every sample size m = 0, ..., n - 1, in the layout of success_rates.
+  """
+  import numpy as np
+
+  return np.array([[exact_success_rate(n, m, s) for m in range(n)] for s in ss])
+
 def plot_success_rates(success_rates: list, n: int, s: int):
   """
     Plots the success rates for different sample sizes.
@@ -70,13 +181,43 @@ def plot_success_rates(success_rates: list, n: int, s: int):
   plt.close()
 
 if __name__ == "__main__":
-  n = int(sys.argv[1])
+  import numpy as np
 
-  for s in [1, 3, 5, 10]:
-    success_rates = []
-    for m in tqdm(range(n)):
-      success_rates.append(success_rate_m(n, m, s, 10000))
+  if len(sys.argv) not in [2, 3] or (len(sys.argv) == 3 and sys.argv[2] not in ["simulate", "exact", "validate"]):
+    print("Usage: python secretary-problem.py n [simulate|exact|validate]")
+    sys.exit(1)
 
-    plot_success_rates(success_rates, n, s)
+  n = int(sys.argv[1])
+  mode = sys.argv[2] if len(sys.argv) == 3 else "simulate"
+
+  if n < 1:
+    print("n must be greater than 0.")
+    sys.exit(1)
+
+  ss = [1, 3, 5, 10]
+  trials = 10000
+
+  if mode == "exact":
+    rates = exact_success_rates(n, ss)
+  else:
+    # seeded, so the simulated rates only depend on n, ss, trials and this file and reruns are served from the result cache
+    cache = result_cache.default_cache()
+    key = result_cache.make_key("secretary-problem/simulate", [n, ss, trials], [SEED], result_cache.code_version(__file__))
+    rates = cache.get(key) if cache is not None else None
+
+    if rates is None:
+      np.random.seed(SEED)
+      rates = success_rates(n, ss, trials)
+      if cache is not None:
+        cache.put(key, rates)
+
+  if mode == "validate":
+    # Monte Carlo error of the simulated rates against the exact ones (in percentage points)
+    errors = np.abs(rates - exact_success_rates(n, ss))
+    for i, s in enumerate(ss):
+      print(f"s = {s}: max error = {errors[i].max():.4f}, mean error = {errors[i].mean():.4f}")
+
+  for i, s in enumerate(ss):
+    plot_success_rates(rates[i], n, s)
 
   
\ No newline at end of file